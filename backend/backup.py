@@ -0,0 +1,413 @@
+"""
+Online backups and restores of wardrobe.db and the uploaded images.
+
+    <backup dir>/snapshots/wardrobe-<timestamp>.db.gz    compressed database
+    <backup dir>/snapshots/wardrobe-<timestamp>.json     manifest (images, sync version)
+    <backup dir>/images/<sha256>.<ext>                   originals, shared by all snapshots
+
+The database is copied with SQLite's online backup API, BACKUP_PAGES pages
+per step on a background thread, so requests keep reading and writing while
+a backup runs. A commit from another connection normally restarts a stepped
+backup, so under steady writes it might never finish. In WAL mode the
+source connection therefore holds one read transaction across all steps:
+the copy is a consistent snapshot and writers are not blocked. In
+rollback-journal mode that would block writers, so each step takes its own
+short read lock instead. Images are
+content-addressed, so only originals missing from the backup store are
+copied, each one checked against its hash. Thumbnails are not backed up
+because they are regenerated from the originals. The newest KEEP snapshots
+are kept, and images no kept snapshot references are pruned.
+
+A restore first snapshots the current state, so it can be undone. It then
+migrates a copy of the chosen snapshot and backs it up into the live
+database, which holds the live write lock from the first step to the last,
+and brings back any missing originals. Only one job runs at a time.
+
+Sync clients must not see the sync version go backwards. Once the first
+step holds the live write lock, the live sync version and ids are final,
+so the snapshot is restamped then (see _restamp): its sync version becomes
+max(live, snapshot) + 1, every row is stamped with it, ids that only the
+live database had get tombstones, and the AUTOINCREMENT counters move past
+every live id so none of them is handed out again. These writes go through
+the backup's source connection, so SQLite carries them into the copy.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import create_engine
+
+from backend import events, images
+from backend.database.database import data_dir, db_path
+from backend.database.migrations import migrate
+from backend.database.tag_cache import tag_id_cache
+from backend.database.tag_index import tag_index
+from backend.database.versions import data_versions
+
+logger = logging.getLogger(__name__)
+
+BACKUP_DIR = os.getenv("WARDROBE_BACKUP_DIR") or os.path.join(data_dir, "backups")
+SNAPSHOTS_DIR = os.path.join(BACKUP_DIR, "snapshots")
+IMAGES_DIR = os.path.join(BACKUP_DIR, "images")
+KEEP = int(os.getenv("WARDROBE_BACKUP_KEEP", "7"))
+
+# 1024 pages is 4 MB with the default page size
+BACKUP_PAGES = 1024
+COPY_CHUNK = 1024 * 1024
+
+
+class BackupError(RuntimeError):
+    pass
+
+
+class Job:
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind  # backup / restore
+        self.state = "running"  # running / done / failed
+        self.phase = "starting"
+        self.progress = 0.0  # of the current phase, 0..1
+        self.snapshot: Optional[str] = None
+        # restores: the snapshot of the state they replaced
+        self.undo_snapshot: Optional[str] = None
+        self.error: Optional[str] = None
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+
+    def step(self, phase: str, progress: float = 0.0):
+        self.phase = phase
+        self.progress = progress
+
+
+_jobs: dict[str, Job] = {}
+_running: Optional[Job] = None
+_lock = threading.Lock()
+
+
+# ---------- SNAPSHOTS ----------
+
+def _snapshot_name() -> str:
+    return "wardrobe-" + datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S-%f")
+
+def _manifest_path(name: str) -> str:
+    return os.path.join(SNAPSHOTS_DIR, f"{name}.json")
+
+def _read_manifest(name: str) -> dict:
+    with open(_manifest_path(name), "rb") as f:
+        return json.load(f)
+
+def list_snapshots() -> list[dict]:
+    """Manifests of the stored snapshots, newest first."""
+    if not os.path.isdir(SNAPSHOTS_DIR):
+        return []
+    names = sorted(
+        (entry[:-5] for entry in os.listdir(SNAPSHOTS_DIR) if entry.endswith(".json")),
+        reverse=True,
+    )
+    return [_read_manifest(name) for name in names]
+
+
+def _copy_database(
+    source: sqlite3.Connection,
+    target: sqlite3.Connection,
+    job: Job,
+    pages: int,
+    on_locked=None,
+):
+    """`on_locked` runs once, after the first step that took the target's write lock."""
+    def progress(status, remaining, total):
+        nonlocal on_locked
+        if on_locked is not None and status == sqlite3.SQLITE_OK:
+            on_locked, locked = None, on_locked
+            locked()
+        job.progress = (total - remaining) / total if total else 1.0
+        # let request threads run between steps
+        time.sleep(0)
+
+    source.backup(target, pages=pages, progress=progress)
+
+
+def _compress(path: str, target: str):
+    partial = target + ".part"
+    with open(path, "rb") as src, gzip.open(partial, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, COPY_CHUNK)
+    os.replace(partial, target)
+
+
+def _copy_verified(source: str, target: str, digest: str) -> bool:
+    """Copies `source` if its content matches `digest`; False if it doesn't."""
+    sha = hashlib.sha256()
+    partial = target + ".part"
+    with open(source, "rb") as src, open(partial, "wb") as dst:
+        while chunk := src.read(COPY_CHUNK):
+            sha.update(chunk)
+            dst.write(chunk)
+    if sha.hexdigest() != digest:
+        os.remove(partial)
+        return False
+    os.replace(partial, target)
+    return True
+
+
+def _backup_images(job: Job) -> list[str]:
+    """Adds new originals to the image store; returns every backed-up name."""
+    if not os.path.isdir(images.IMAGES_DIR):
+        return []
+    names = sorted(name for name in os.listdir(images.IMAGES_DIR) if images.ORIGINAL_NAME.match(name))
+    stored = set(os.listdir(IMAGES_DIR))
+    backed_up = []
+    for done, name in enumerate(names, 1):
+        if name in stored or _copy_verified(
+            os.path.join(images.IMAGES_DIR, name),
+            os.path.join(IMAGES_DIR, name),
+            images.ORIGINAL_NAME.match(name)["digest"],
+        ):
+            backed_up.append(name)
+        else:
+            logger.warning("Backup: skipped %s, its content does not match its hash", name)
+        job.progress = done / len(names)
+    return backed_up
+
+
+def _rotate(protect: tuple = ()):
+    snapshots = list_snapshots()
+    kept = snapshots[:KEEP] + [manifest for manifest in snapshots[KEEP:] if manifest["name"] in protect]
+    for manifest in snapshots[KEEP:]:
+        if manifest["name"] in protect:
+            continue
+        for path in (os.path.join(SNAPSHOTS_DIR, manifest["file"]), _manifest_path(manifest["name"])):
+            if os.path.exists(path):
+                os.remove(path)
+
+    referenced = {name for manifest in kept for name in manifest["images"]}
+    for name in os.listdir(IMAGES_DIR):
+        if name not in referenced:
+            os.remove(os.path.join(IMAGES_DIR, name))
+
+
+def _run_backup(job: Job, protect: tuple = ()) -> str:
+    os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
+    os.makedirs(IMAGES_DIR, exist_ok=True)
+    name = _snapshot_name()
+    raw = os.path.join(SNAPSHOTS_DIR, f"{name}.db.part")
+
+    job.step("database")
+    source = sqlite3.connect(db_path, isolation_level=None)
+    target = sqlite3.connect(raw)
+    try:
+        if source.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+            # pin one snapshot for every step (see the module docstring)
+            source.execute("BEGIN")
+            source.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone()
+        _copy_database(source, target, job, BACKUP_PAGES)
+        # a standalone file: no -wal sidecar next to the copy
+        target.execute("PRAGMA journal_mode=DELETE")
+        sync_version = target.execute(
+            "SELECT value FROM app_meta WHERE key = 'sync_version'"
+        ).fetchone()
+    finally:
+        target.close()
+        source.close()
+
+    try:
+        job.step("compress")
+        _compress(raw, os.path.join(SNAPSHOTS_DIR, f"{name}.db.gz"))
+    finally:
+        os.remove(raw)
+
+    job.step("images")
+    image_names = _backup_images(job)
+
+    manifest = {
+        "name": name,
+        "file": f"{name}.db.gz",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "size": os.path.getsize(os.path.join(SNAPSHOTS_DIR, f"{name}.db.gz")),
+        "sync_version": int(sync_version[0]) if sync_version else None,
+        "images": image_names,
+    }
+    # the manifest is written last: a snapshot without one is incomplete
+    partial = _manifest_path(name) + ".part"
+    with open(partial, "w") as f:
+        json.dump(manifest, f)
+    os.replace(partial, _manifest_path(name))
+
+    job.step("rotate")
+    _rotate(protect)
+    return name
+
+
+# ---------- RESTORE ----------
+
+SYNCED_ENTITIES = {"items": "item", "locations": "location", "categories": "category", "tags": "tag"}
+
+
+def _sync_state(conn: sqlite3.Connection) -> tuple[int, dict[str, set]]:
+    version = conn.execute("SELECT value FROM app_meta WHERE key = 'sync_version'").fetchone()
+    ids = {
+        table: {row[0] for row in conn.execute(f"SELECT id FROM {table}")}
+        for table in SYNCED_ENTITIES
+    }
+    return int(version[0]) if version else 0, ids
+
+
+def _restamp(source: sqlite3.Connection) -> int:
+    """
+    Moves the snapshot in `source` past the live database's sync version
+    (see the module docstring); returns the new sync version. Must run
+    while the restore holds the live write lock.
+    """
+    live = sqlite3.connect(db_path, timeout=30)
+    try:
+        live_version, live_ids = _sync_state(live)
+        live_sequence = dict(live.execute("SELECT name, seq FROM sqlite_sequence"))
+    finally:
+        live.close()
+    restored_version, restored_ids = _sync_state(source)
+    version = max(live_version, restored_version) + 1
+
+    source.execute("BEGIN")
+    for table, entity in SYNCED_ENTITIES.items():
+        source.execute(f"UPDATE {table} SET version = ?", (version,))
+        source.executemany(
+            "INSERT INTO deletions (entity, entity_id, version) VALUES (?, ?, ?)",
+            [(entity, entity_id, version) for entity_id in sorted(live_ids[table] - restored_ids[table])],
+        )
+        # new rows must not take ids the live database used or tombstoned
+        source.execute(
+            "UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = ?",
+            (max([live_sequence.get(table, 0), *live_ids[table]]), table),
+        )
+    source.execute(
+        "UPDATE app_meta SET value = ? WHERE key = 'sync_version'", (str(version),)
+    )
+    source.execute("COMMIT")
+    return version
+
+
+def _after_restore(sync_version: int):
+    # everything cached in memory describes the old database
+    tag_id_cache.invalidate()
+    tag_index.invalidate()
+    data_versions.bump("items", "locations", "categories", "tags")
+    events.publish("database", None, "restore", sync_version)
+
+
+def _run_restore(job: Job, name: str) -> str:
+    manifest = _read_manifest(name)
+
+    # undo point; also proves the live database is readable
+    job.undo_snapshot = _run_backup(job, protect=(name,))
+
+    job.step("decompress")
+    raw = os.path.join(data_dir, f"{name}.restore.part")
+    restamped = []
+    try:
+        with gzip.open(os.path.join(SNAPSHOTS_DIR, manifest["file"]), "rb") as src, open(raw, "wb") as dst:
+            shutil.copyfileobj(src, dst, COPY_CHUNK)
+
+        source = sqlite3.connect(raw, isolation_level=None)
+        try:
+            if source.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+                raise BackupError(f"Snapshot {name} is corrupt")
+
+            # older snapshots may predate the current schema
+            raw_engine = create_engine(f"sqlite:///{raw}")
+            try:
+                migrate(raw_engine)
+            finally:
+                raw_engine.dispose()
+
+            job.step("database")
+            target = sqlite3.connect(db_path, timeout=30)
+            try:
+                # the first step is a single page, so the write lock is
+                # taken before anything is committed; until the last step
+                # readers keep seeing the old database
+                _copy_database(
+                    source, target, job, 1,
+                    on_locked=lambda: restamped.append(_restamp(source)),
+                )
+            finally:
+                target.close()
+        finally:
+            source.close()
+    finally:
+        if os.path.exists(raw):
+            os.remove(raw)
+    if not restamped:
+        # cannot happen with a real schema (far more than one page), but a
+        # restore that skipped the restamp must not pass silently
+        raise BackupError(f"Snapshot {name} was restored without a new sync version")
+
+    job.step("images")
+    os.makedirs(images.IMAGES_DIR, exist_ok=True)
+    for done, image in enumerate(manifest["images"], 1):
+        live = os.path.join(images.IMAGES_DIR, image)
+        if not os.path.exists(live):
+            match = images.ORIGINAL_NAME.match(image)
+            shutil.copyfile(os.path.join(IMAGES_DIR, image), live)
+            images.schedule_thumbnails(match["digest"], match["ext"])
+        job.progress = done / len(manifest["images"])
+
+    job.step("finishing")
+    _after_restore(restamped[0])
+    return name
+
+
+# ---------- JOBS ----------
+
+def _run(job: Job, fn, *args):
+    global _running
+    try:
+        job.snapshot = fn(job, *args)
+        job.state = "done"
+        job.progress = 1.0
+    except Exception as e:
+        logger.exception("%s failed", job.kind.capitalize())
+        job.state = "failed"
+        job.error = str(e)
+    finally:
+        job.finished_at = datetime.now(timezone.utc)
+        with _lock:
+            _running = None
+
+
+def _start(kind: str, fn, *args) -> Job:
+    global _running
+    with _lock:
+        if _running is not None:
+            raise BackupError(f"A {_running.kind} is already running")
+        job = _running = Job(kind)
+        _jobs[job.id] = job
+    threading.Thread(target=_run, args=(job, fn, *args), name=f"wardrobe-{kind}", daemon=True).start()
+    return job
+
+
+def start_backup() -> Job:
+    return _start("backup", _run_backup)
+
+
+def start_restore(name: Optional[str] = None) -> Job:
+    """Restores snapshot `name`, or the newest one. Raises LookupError if missing."""
+    snapshots = list_snapshots()
+    if name is None:
+        if not snapshots:
+            raise LookupError("No snapshots to restore")
+        name = snapshots[0]["name"]
+    elif not any(manifest["name"] == name for manifest in snapshots):
+        raise LookupError(f"Snapshot {name} not found")
+    return _start("restore", _run_restore, name)
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    return _jobs.get(job_id)
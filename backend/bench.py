@@ -0,0 +1,458 @@
+"""
+Benchmark harness for the items, locations, categories, tags and stats routes.
+
+    python -m backend.bench                                # 1k, 10k and 100k items
+    python -m backend.bench --sizes 1000 --requests 50 --concurrency 4
+    python -m backend.bench --save-baseline bench-baseline.json
+    python -m backend.bench --baseline bench-baseline.json  # exit 1 on regression
+
+Every size runs in a fresh subprocess with its own temporary WARDROBE_DATA_DIR,
+so the database, the caches and peak RSS never leak between sizes. The worker
+seeds synthetic wardrobes through crud, then drives the routes in-process with
+httpx's ASGITransport (no sockets, no uvicorn). WARDROBE_DB_MODE and
+WARDROBE_DB_PROFILE are passed through, so both stacks can be compared.
+
+The worker runs with WARDROBE_QUERY_GUARD=raise unless it is set, so a
+route that starts running queries in a loop fails its requests. Any failed
+request makes the run exit 1, like a regression against --baseline.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+# whole-table routes (full list, export) get fewer requests at large sizes
+HEAVY_REQUESTS = 5
+
+# statements run on behalf of the current benchmark request
+_queries: ContextVar[Optional[list]] = ContextVar("bench_queries", default=None)
+
+
+# ---------- SYNTHETIC DATA ----------
+
+BRANDS = [
+    "Uniqlo", "Levi's", "Zara", "H&M", "Nike", "Adidas", "Patagonia", "COS",
+    "Arket", "Carhartt", "Muji", "Everlane", "Acne", "Dr. Martens", "Vans",
+]
+COLORS = ["black", "white", "navy", "grey", "beige", "olive", "brown", "blue", "red", "green"]
+FITS = ["slim", "regular", "relaxed", "oversized", None]
+SEASONS = ["summer", "winter", "spring", "autumn", "all", None]
+TAG_WORDS = [
+    "cotton", "linen", "wool", "denim", "leather", "casual", "formal", "work",
+    "gym", "travel", "vintage", "basics", "layering", "rain", "evening", "weekend",
+    "favorite", "gift", "repair", "summer-trip", "office", "hiking", "beach", "party",
+]
+
+
+def _zipf_weights(n: int) -> list:
+    # a few very common values and a long tail, like real wardrobes
+    return [1 / rank for rank in range(1, n + 1)]
+
+
+def make_tag_names(rng: random.Random, count: int = 300) -> list:
+    names = list(TAG_WORDS)
+    while len(names) < count:
+        names.append(f"{rng.choice(TAG_WORDS)}-{len(names)}")
+    return names
+
+
+def make_items(rng: random.Random, count: int, tag_names: list, category_ids: list, location_ids: list):
+    from backend.database import schemas
+
+    tag_weights = _zipf_weights(len(tag_names))
+    brand_weights = _zipf_weights(len(BRANDS))
+    for n in range(count):
+        tag_count = rng.choices([0, 1, 2, 3, 4, 5], weights=[10, 25, 30, 20, 10, 5])[0]
+        tags = set(rng.choices(tag_names, weights=tag_weights, k=tag_count))
+        yield schemas.ItemCreate(
+            name=f"{rng.choice(COLORS)} item {n}",
+            color=rng.choice(COLORS),
+            fit=rng.choice(FITS),
+            brand=rng.choices(BRANDS, weights=brand_weights)[0],
+            notes=rng.choice([None, None, "needs ironing", "bought on sale", "hand wash only"]),
+            season=rng.choice(SEASONS),
+            rating=rng.choice([None, 1, 2, 3, 4, 5]),
+            category_id=rng.choice(category_ids),
+            location_id=rng.choice(location_ids + [None]),
+            tags=sorted(tags),
+        )
+
+
+def seed(count: int, rng: random.Random, chunk_size: int = 5000) -> dict:
+    from backend.database import crud, models
+    from backend.database.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        category_ids = [row.id for row in db.query(models.Category.id)]
+        location_ids = [row.id for row in db.query(models.Location.id)]
+        tag_names = make_tag_names(rng)
+
+        items = make_items(rng, count, tag_names, category_ids, location_ids)
+        while True:
+            chunk = [item for _, item in zip(range(chunk_size), items)]
+            if not chunk:
+                break
+            crud.bulk_create_items(db, chunk)
+    finally:
+        db.close()
+
+    return {
+        "category_ids": category_ids,
+        "location_ids": location_ids,
+        "tag_names": tag_names,
+        "item_ids": list(range(1, count + 1)),
+    }
+
+
+# ---------- SCENARIOS ----------
+
+def scenarios(data: dict, rng: random.Random, size: int, requests: int) -> list:
+    """
+    (name, request factory, request count override). Reads run first so they
+    see exactly the seeded table; the factories return httpx request kwargs.
+    `requests` sizes the pools the delete scenarios draw from.
+    """
+    from backend.database import crud, models, schemas
+    from backend.database.database import SessionLocal
+    from backend.database.migrations import SYNC_VERSION_KEY
+
+    def item_payload():
+        return next(make_items(rng, 1, data["tag_names"], data["category_ids"], data["location_ids"])).model_dump()
+
+    def prefix():
+        word = rng.choice(BRANDS + TAG_WORDS)
+        return word[: max(2, len(word) // 2)]
+
+    # rows the delete scenarios remove, one per request, created up front
+    # and not timed
+    db = SessionLocal()
+    try:
+        # the delta sync scenario asks for everything written from here on
+        synced = int(db.get(models.AppMeta, SYNC_VERSION_KEY).value)
+        doomed_items = [
+            crud.create_item(db, schemas.ItemCreate(**item_payload())).id for _ in range(requests)
+        ]
+        doomed_locations = [
+            crud.create_location(db, schemas.LocationCreate(name=f"bench {n}")).id for n in range(requests)
+        ]
+        doomed_categories = [
+            crud.create_category(db, schemas.CategoryCreate(name=f"bench {n}")).id for n in range(requests)
+        ]
+    finally:
+        db.close()
+
+    heavy = HEAVY_REQUESTS if size >= 10_000 else None
+    counter = iter(range(10**9))
+    return [
+        ("GET /api/items/ (full list)", lambda: {"method": "GET", "url": "/api/items/"}, heavy),
+        ("GET /api/items/ (columnar, br)", lambda: {
+            "method": "GET", "url": "/api/items/",
+            "headers": {"Accept": "application/vnd.wardrobe.columnar+json", "Accept-Encoding": "br, gzip"},
+        }, heavy),
+        ("GET /api/items/ (page)", lambda: {"method": "GET", "url": "/api/items/", "params": {"limit": 50}}, None),
+        ("GET /api/items/ (filtered page)", lambda: {
+            "method": "GET", "url": "/api/items/",
+            "params": {"limit": 50, "category_id": rng.choice(data["category_ids"]), "season": "winter"},
+        }, None),
+        ("GET /api/items/ (tag page)", lambda: {
+            "method": "GET", "url": "/api/items/",
+            "params": {"limit": 50, "tag": rng.choice(data["tag_names"][:20])},
+        }, None),
+        ("GET /api/items/search", lambda: {"method": "GET", "url": "/api/items/search", "params": {"q": prefix()}}, None),
+        ("GET /api/items/export", lambda: {"method": "GET", "url": "/api/items/export"}, heavy),
+        ("GET /api/sync (full)", lambda: {"method": "GET", "url": "/api/sync"}, heavy),
+        ("GET /api/sync (delta)", lambda: {"method": "GET", "url": "/api/sync", "params": {"since": synced}}, None),
+        ("GET /api/locations/", lambda: {"method": "GET", "url": "/api/locations/"}, None),
+        ("GET /api/categories/", lambda: {"method": "GET", "url": "/api/categories/"}, None),
+        ("GET /api/stats", lambda: {"method": "GET", "url": "/api/stats"}, None),
+        ("GET /api/tags/ (autocomplete)", lambda: {
+            "method": "GET", "url": "/api/tags/", "params": {"prefix": rng.choice(TAG_WORDS)[:2]},
+        }, None),
+        ("POST /api/items/", lambda: {"method": "POST", "url": "/api/items/", "json": item_payload()}, None),
+        ("POST /api/items/bulk", lambda: {
+            "method": "POST", "url": "/api/items/bulk", "json": [item_payload() for _ in range(100)],
+        }, heavy),
+        # 3000 tags nobody has used yet: the tag lookup and INSERT run in
+        # batches, which the query guard must not take for a loop
+        ("POST /api/items/bulk (new tags)", lambda: {
+            "method": "POST", "url": "/api/items/bulk", "json": [
+                {**item_payload(), "tags": [f"bench tag {next(counter)}" for _ in range(30)]}
+                for _ in range(100)
+            ],
+        }, heavy),
+        ("PUT /api/items/{id}", lambda: {
+            "method": "PUT", "url": f"/api/items/{rng.choice(data['item_ids'])}",
+            "json": {"rating": rng.randint(1, 5), "tags": sorted(rng.sample(data["tag_names"][:50], 2))},
+        }, None),
+        ("PATCH /api/items/batch", lambda: {
+            "method": "PATCH", "url": "/api/items/batch",
+            "json": {
+                "ids": rng.sample(data["item_ids"], min(50, len(data["item_ids"]))),
+                "changes": {"season": rng.choice(SEASONS)},
+                "add_tags": [rng.choice(data["tag_names"][:50])],
+            },
+        }, None),
+        ("DELETE /api/items/{id}", lambda: {"method": "DELETE", "url": f"/api/items/{doomed_items.pop()}"}, None),
+        ("POST /api/locations/", lambda: {
+            "method": "POST", "url": "/api/locations/", "json": {"name": f"shelf {next(counter)}"},
+        }, None),
+        ("PUT /api/locations/{id}", lambda: {
+            "method": "PUT", "url": f"/api/locations/{rng.choice(data['location_ids'])}",
+            "json": {"comments": f"touched {next(counter)}"},
+        }, None),
+        ("DELETE /api/locations/{id}", lambda: {"method": "DELETE", "url": f"/api/locations/{doomed_locations.pop()}"}, None),
+        ("POST /api/categories/", lambda: {
+            "method": "POST", "url": "/api/categories/", "json": {"name": f"category {next(counter)}"},
+        }, None),
+        ("PUT /api/categories/{id}", lambda: {
+            "method": "PUT", "url": f"/api/categories/{rng.choice(data['category_ids'])}",
+            "json": {"comments": f"touched {next(counter)}"},
+        }, None),
+        ("DELETE /api/categories/{id}", lambda: {"method": "DELETE", "url": f"/api/categories/{doomed_categories.pop()}"}, None),
+    ]
+
+
+# ---------- MEASUREMENT ----------
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        # Windows: no getrusage
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _percentile(ordered: list, p: float) -> float:
+    # nearest-rank
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+async def run_scenario(client, make_request, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, query_counts, failures = [], [], 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            kwargs = make_request()
+            counter = [0]
+            _queries.set(counter)
+            start = time.perf_counter()
+            response = await client.request(**kwargs)
+            latencies.append(time.perf_counter() - start)
+            query_counts.append(counter[0])
+            if response.status_code >= 400:
+                failures += 1
+
+    start = time.perf_counter()
+    # each task runs in its own copy of the context, so counters never mix
+    await asyncio.gather(*(one() for _ in range(requests)))
+    wall = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    return {
+        "requests": requests,
+        "failures": failures,
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+        "throughput_rps": round(requests / wall, 1),
+        "queries_per_request": round(sum(query_counts) / len(query_counts), 2),
+    }
+
+
+async def run_worker(size: int, requests: int, concurrency: int, seed_value: int) -> dict:
+    import httpx
+    from sqlalchemy import event
+
+    from backend.database.database import async_engine, engine
+    from backend.main import app, run_startup
+
+    # ASGITransport does not run the lifespan
+    run_startup()
+
+    rng = random.Random(seed_value)
+    start = time.perf_counter()
+    data = seed(size, rng)
+    seed_seconds = time.perf_counter() - start
+
+    event.listen(engine, "before_cursor_execute", _count_statement)
+    if async_engine is not None:
+        event.listen(async_engine.sync_engine, "before_cursor_execute", _count_statement)
+
+    reported = set()
+
+    async def reporting_app(scope, receive, send):
+        # the transport swallows the exception behind a 500; print why once
+        try:
+            await app(scope, receive, send)
+        except Exception as e:
+            message = f"{scope['method']} {scope['path']}: {type(e).__name__}: {e}"
+            if message not in reported:
+                reported.add(message)
+                print(f"  error {message[:300]}", file=sys.stderr)
+            raise
+
+    routes = {}
+    # a server error is a failed request, as it would be over a socket;
+    # raised into the client it would abort the run with requests in flight
+    transport = httpx.ASGITransport(app=reporting_app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, make_request, override in scenarios(data, rng, size, requests):
+            count = min(requests, override) if override else requests
+            routes[name] = await run_scenario(client, make_request, count, concurrency)
+            print(f"  {size:>7} {name:<34} p95 {routes[name]['p95_ms']:>9.2f} ms", file=sys.stderr)
+
+    return {
+        "items": size,
+        "seed_seconds": round(seed_seconds, 2),
+        "peak_rss_mb": _peak_rss_mb(),
+        "routes": routes,
+    }
+
+
+# ---------- BASELINE ----------
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Flags routes whose p95 grew, or whose throughput fell, by more than
+    `tolerance`, and any route that now runs at least one more query per
+    request.
+    """
+    regressions = []
+    for size, run in results["runs"].items():
+        old_run = baseline.get("runs", {}).get(size)
+        if not old_run:
+            continue
+        for name, new in run["routes"].items():
+            old = old_run["routes"].get(name)
+            if not old:
+                continue
+            problems = []
+            if new["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+                problems.append(f"p95 {old['p95_ms']} -> {new['p95_ms']} ms")
+            if new["throughput_rps"] < old["throughput_rps"] * (1 - tolerance):
+                problems.append(f"throughput {old['throughput_rps']} -> {new['throughput_rps']} rps")
+            # averages wobble with cache hits; a whole extra statement is real
+            if new["queries_per_request"] >= old["queries_per_request"] + 1:
+                problems.append(
+                    f"queries {old['queries_per_request']} -> {new['queries_per_request']}"
+                )
+            if problems:
+                regressions.append({"items": int(size), "route": name, "problems": problems})
+    return regressions
+
+
+# ---------- CLI ----------
+
+def _run_size(size: int, args) -> dict:
+    with tempfile.TemporaryDirectory(prefix="wardrobe-bench-") as data_dir:
+        env = dict(os.environ, WARDROBE_DATA_DIR=data_dir)
+        env.setdefault("WARDROBE_QUERY_GUARD", "raise")
+        completed = subprocess.run(
+            [
+                sys.executable, "-m", "backend.bench", "--worker",
+                "--items", str(size),
+                "--requests", str(args.requests),
+                "--concurrency", str(args.concurrency),
+                "--seed", str(args.seed),
+            ],
+            env=env,
+            stdout=subprocess.PIPE,
+            check=True,
+        )
+    # the worker prints its result as the last line of stdout
+    return json.loads(completed.stdout.decode().strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.bench", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="report to compare against; exit 1 on regression")
+    parser.add_argument("--save-baseline", help="also write the report here")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 / throughput drift")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--items", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        result = asyncio.run(run_worker(args.items, args.requests, args.concurrency, args.seed))
+        print(json.dumps(result))
+        return 0
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "db_mode": os.getenv("WARDROBE_DB_MODE", "sync"),
+            "db_profile": os.getenv("WARDROBE_DB_PROFILE", "performance"),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "runs": {str(size): _run_size(size, args) for size in args.sizes},
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        results["regressions"] = regressions
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['items']} items, {regression['route']}: "
+                + "; ".join(regression["problems"]),
+                file=sys.stderr,
+            )
+
+    failed = [
+        (size, name, route["failures"])
+        for size, run in results["runs"].items()
+        for name, route in run["routes"].items()
+        if route["failures"]
+    ]
+    for size, name, failures in failed:
+        print(f"FAILED {size} items, {name}: {failures} requests", file=sys.stderr)
+
+    report = json.dumps(results, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
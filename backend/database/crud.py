@@ -1,115 +1,634 @@
-from sqlalchemy.orm import Session
+import base64
+from collections import Counter
+from typing import Iterable, Iterator, Optional
+
+import orjson
+from sqlalchemy import (
+    Integer,
+    String,
+    and_,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.expression import UnaryExpression
+
+from backend import events
+from backend.images import thumbnail_urls
 
 from . import models, schemas
+from .migrations import REFRESH_SEARCH_TAGS, SYNC_VERSION_KEY
+from .tag_cache import tag_id_cache
+from .tag_index import TagIndex, tag_index
+from .versions import data_versions
+
+
+# ---------- SYNC ----------
+
+def _next_sync_version(db: Session) -> int:
+    """
+    Allocates the sync version for the current write transaction. Every row
+    the transaction touches is stamped with it (see models.SyncMixin).
+    """
+    value = db.execute(
+        update(models.AppMeta)
+        .where(models.AppMeta.key == SYNC_VERSION_KEY)
+        .values(value=cast(cast(models.AppMeta.value, Integer) + 1, String))
+        .returning(models.AppMeta.value)
+    ).scalar_one()
+    return int(value)
+
+def _log_deletion(db: Session, entity: str, entity_id: int, version: int):
+    db.add(models.Deletion(entity=entity, entity_id=entity_id, version=version))
+
+SYNCED_MODELS = {
+    "item": models.Item,
+    "location": models.Location,
+    "category": models.Category,
+    "tag": models.Tag,
+}
+
+def get_changes(db: Session, since: int = 0):
+    """
+    Everything created, updated or deleted after sync version `since`
+    (since <= 0 returns a full snapshot). All reads share one transaction,
+    so the returned version is consistent with the returned rows.
+    """
+    # pysqlite only opens transactions for writes; without this every
+    # SELECT below would see whatever had committed by the time it ran
+    db.connection().exec_driver_sql("BEGIN")
+    version = int(db.get(models.AppMeta, SYNC_VERSION_KEY).value)
+
+    def changed(model):
+        query = select(model)
+        if since > 0:
+            query = query.where(model.version > since)
+        return query.order_by(model.id)
+
+    deleted = []
+    if since > 0:
+        # a tombstone followed by a live row with the same id (ids reused
+        # before AUTOINCREMENT, or a restore) would delete that row
+        superseded = or_(*(
+            and_(
+                models.Deletion.entity == entity,
+                exists().where(
+                    model.id == models.Deletion.entity_id,
+                    model.version > models.Deletion.version,
+                ),
+            )
+            for entity, model in SYNCED_MODELS.items()
+        ))
+        deleted = db.scalars(
+            select(models.Deletion)
+            .where(models.Deletion.version > since, ~superseded)
+            .order_by(models.Deletion.id)
+        ).all()
+
+    # same projection as the item list: tags come back per row as JSON
+    # instead of one selectinload statement per 500 items
+    items = _item_rows_query()
+    if since > 0:
+        items = items.where(models.Item.version > since)
+
+    return {
+        "version": version,
+        "items": _item_row_dicts(db.execute(items)),
+        "locations": db.scalars(changed(models.Location)).all(),
+        "categories": db.scalars(changed(models.Category)).all(),
+        "tags": db.scalars(changed(models.Tag)).all(),
+        "deleted": deleted,
+    }
+
 
 
 # ---------- ITEMS ----------
 
-def get_items(db: Session):
-    return db.query(models.Item).all()
+def _encode_cursor(item_id: int) -> str:
+    return base64.urlsafe_b64encode(str(item_id).encode()).decode()
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+def _unindexed(column):
+    # SQLite's unary "+" keeps a term from choosing the index
+    return UnaryExpression(column, operator=operators.custom_op("+"), type_=column.type)
+
+def _item_conditions(
+    cursor: Optional[str] = None,
+    category_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    season: Optional[str] = None,
+    brand: Optional[str] = None,
+    color: Optional[str] = None,
+    min_rating: Optional[int] = None,
+    max_rating: Optional[int] = None,
+    tag: Optional[str] = None,
+):
+    conditions = []
+    if category_id is not None:
+        conditions.append(models.Item.category_id == category_id)
+    if location_id is not None:
+        conditions.append(models.Item.location_id == location_id)
+    if season is not None:
+        season_column = models.Item.season
+        if category_id is not None:
+            # ix_items_category_season_brand must drive category + season.
+            # Without ANALYZE statistics SQLite picks ix_items_season because
+            # it yields id order, then reads every item of that season.
+            season_column = _unindexed(season_column)
+        conditions.append(season_column == season)
+    if brand is not None:
+        conditions.append(models.Item.brand == brand)
+    if color is not None:
+        conditions.append(models.Item.color == color)
+    if min_rating is not None:
+        conditions.append(models.Item.rating >= min_rating)
+    if max_rating is not None:
+        conditions.append(models.Item.rating <= max_rating)
+    if tag is not None:
+        # an IN over the tag's links walks ix_item_tags_tag_id_item_id;
+        # Item.tags.any() is a correlated EXISTS probed once per item
+        conditions.append(models.Item.id.in_(
+            select(models.item_tags.c.item_id)
+            .join(models.Tag, models.Tag.id == models.item_tags.c.tag_id)
+            .where(models.Tag.name == tag)
+        ))
+    if cursor is not None:
+        conditions.append(models.Item.id > _decode_cursor(cursor))
+    return conditions
+
+def _paginate(db: Session, query, limit: Optional[int], item_id):
+    """
+    Runs a query ordered by item id and returns (rows, next_cursor);
+    `item_id` extracts the id from a result row.
+    """
+    if limit is None:
+        return db.execute(query).all(), None
+
+    # fetch one extra row to know whether another page exists
+    rows = db.execute(query.limit(limit + 1)).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, _encode_cursor(item_id(rows[-1]))
+
+# ItemOut fields in declaration order, minus tags (aggregated separately)
+ITEM_OUT_COLUMNS = [field for field in schemas.ItemOut.model_fields if field != "tags"]
+
+def _item_tags_json():
+    # the lookup walks item_tags' (item_id, tag_id) primary key, so tags come
+    # out in id order, matching Item.tags
+    return (
+        select(
+            func.json_group_array(
+                func.json_object("id", models.Tag.id, "name", models.Tag.name)
+            )
+        )
+        .select_from(models.item_tags)
+        .join(models.Tag, models.Tag.id == models.item_tags.c.tag_id)
+        .where(models.item_tags.c.item_id == models.Item.id)
+        .correlate(models.Item)
+        .scalar_subquery()
+        .label("tags")
+    )
 
-def create_item(db: Session, item: schemas.ItemCreate):
-    db_item = models.Item(
-        name=item.name,
-        category_id=item.category_id,
-        location_id=item.location_id,
+def get_item_rows(db: Session, limit: Optional[int] = None, **filters):
+    """
+    Returns (items, next_cursor): items as plain dicts shaped like
+    schemas.ItemOut (computed thumbnails included). Only the needed columns
+    are selected and each item's tags come back as one JSON array, so no ORM
+    objects are built.
+
+    `filters` are cursor, category_id, location_id, season, brand, color,
+    min_rating, max_rating and tag. Items are ordered by id (which follows
+    insertion order, i.e. created_at) so the cursor is a stable keyset
+    position; next_cursor is None once the last page has been returned.
+    """
+    rows, next_cursor = _paginate(db, _item_rows_query(**filters), limit, lambda row: row.id)
+    return _item_row_dicts(rows), next_cursor
+
+def _item_rows_query(**filters):
+    return (
+        select(*(getattr(models.Item, column) for column in ITEM_OUT_COLUMNS), _item_tags_json())
+        .where(*_item_conditions(**filters))
+        .order_by(models.Item.id)
+    )
 
-        # descriptive
-        color=item.color,
-        fit=item.fit,
-        brand=item.brand,
-        notes=item.notes,
-        season=item.season,
+def _item_row_dicts(rows) -> list[dict]:
+    items = []
+    for row in rows:
+        item = dict(zip(ITEM_OUT_COLUMNS, row))
+        item["tags"] = orjson.loads(row.tags)
+        item["thumbnails"] = thumbnail_urls(item["image_url"])
+        items.append(item)
+    return items
+
+# BM25 column weights for items_fts: name, brand, color, notes, tags
+_SEARCH_WEIGHTS = "10.0, 4.0, 2.0, 1.0, 4.0"
+
+def _fts_query(q: str) -> str:
+    # every word becomes a quoted prefix term; FTS5 ANDs them together
+    return " ".join(
+        '"' + word.replace('"', '""') + '"*' for word in q.split()
+    )
 
-        # preference
-        rating=item.rating,
+def _refresh_search_tags(db: Session, item_ids: list[int]):
+    # item_tags has no search triggers: a write that changes links rewrites
+    # each affected search row once, after its last link statement
+    db.execute(
+        text(REFRESH_SEARCH_TAGS.format(item_ids="SELECT value FROM json_each(:item_ids)")),
+        {"item_ids": orjson.dumps(item_ids).decode()},
     )
 
+def search_items(db: Session, q: str, limit: int = 50):
+    """
+    Full-text search over name, brand, color, notes and tag names
+    (see migrations.SEARCH_INDEX_DDL), best BM25 match first.
+    """
+    match = _fts_query(q)
+    if not match:
+        return []
+
+    item_ids = db.scalars(
+        text(
+            "SELECT rowid FROM items_fts WHERE items_fts MATCH :match "
+            f"ORDER BY bm25(items_fts, {_SEARCH_WEIGHTS}) LIMIT :limit"
+        ),
+        {"match": match, "limit": limit},
+    ).all()
+    if not item_ids:
+        return []
+
+    items = db.scalars(
+        select(models.Item)
+        .options(selectinload(models.Item.tags))
+        .where(models.Item.id.in_(item_ids))
+    ).all()
+    rank = {item_id: i for i, item_id in enumerate(item_ids)}
+    return sorted(items, key=lambda item: rank[item.id])
+
+# plain item columns accepted on create/update (everything in ItemCreate but tags)
+ITEM_FIELDS = [
+    "name",
+    "color",
+    "fit",
+    "brand",
+    "notes",
+    "season",
+    "rating",
+    "category_id",
+    "location_id",
+    "image_url",
+]
+
+def _resolve_tag_ids(db: Session, names: Iterable[str], version: int):
+    """
+    Returns ({name: tag_id}, number_of_tags_created).
+
+    Names are looked up in the process-wide tag cache first; the rest are
+    fetched with one IN query, and missing ones are inserted with one
+    batched INSERT ... RETURNING.
+    """
+    names = list(dict.fromkeys(names))
+    tag_ids = tag_id_cache.get_many(names)
+
+    uncached = [name for name in names if name not in tag_ids]
+    if uncached:
+        rows = db.execute(
+            select(models.Tag.name, models.Tag.id).where(_in_json_list(models.Tag.name, uncached))
+        ).tuples().all()
+        tag_ids.update(rows)
+        tag_id_cache.put_many(dict(rows))
+
+    missing = [name for name in names if name not in tag_ids]
+    if missing:
+        # RETURNING carries the name, so row order does not matter; asking
+        # for sort_by_parameter_order makes SQLite insert one row at a time
+        rows = db.execute(
+            insert(models.Tag).returning(models.Tag.name, models.Tag.id),
+            [{"name": name, "version": version} for name in missing],
+        )
+        tag_ids.update(rows.tuples().all())
+        # not committed yet: keep them out of the cache until read back
+        tag_id_cache.invalidate(missing)
+
+    return tag_ids, len(missing)
+
+def create_item(db: Session, item: schemas.ItemCreate):
+    version = _next_sync_version(db)
+    db_item = models.Item(
+        **{field: getattr(item, field) for field in ITEM_FIELDS},
+        version=version,
+    )
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    db.flush()  # get db_item.id without committing
 
     # tags: input is List[str] (tag names)
+    tag_ids = {}
     if item.tags:
-        for tag_name in item.tags:
-            tag = (
-                db.query(models.Tag)
-                .filter(models.Tag.name == tag_name)
-                .first()
-            )
-            if not tag:
-                tag = models.Tag(name=tag_name)
-                db.add(tag)
-                db.flush()  # get tag.id without full commit
+        tag_ids, _ = _resolve_tag_ids(db, item.tags, version)
+        db.execute(
+            insert(models.item_tags),
+            [{"item_id": db_item.id, "tag_id": tag_id} for tag_id in tag_ids.values()],
+        )
+        _refresh_search_tags(db, [db_item.id])
+
+    with tag_index.writing():
+        db.commit()
+        data_versions.bump("items")
+        tag_index.apply(tag_ids, Counter(tag_ids.values()))
+    events.publish("item", db_item.id, "create", version)
+    db.refresh(db_item)
+    return db_item
+
+def bulk_create_items(db: Session, items: list[schemas.ItemCreate]):
+    """
+    Inserts all items and their tag links in a single transaction.
+    Returns {"created": ..., "tags_created": ...}.
+    """
+    if not items:
+        return {"created": 0, "tags_created": 0}
+
+    version = _next_sync_version(db)
+    tag_ids, tags_created = _resolve_tag_ids(
+        db, (name for item in items for name in item.tags), version
+    )
 
-            if tag not in db_item.tags:
-                db_item.tags.append(tag)
+    # SQLite assigns the ids. An ordered RETURNING would go to SQLite one
+    # row at a time; unordered it stays batched, and since AUTOINCREMENT
+    # ids only grow, sorting them gives them back in insertion order
+    item_ids = sorted(
+        db.execute(
+            # render_nulls: otherwise the ORM splits the batch by which
+            # columns are None
+            insert(models.Item).execution_options(render_nulls=True).returning(models.Item.id),
+            [
+                {**{field: getattr(item, field) for field in ITEM_FIELDS}, "version": version}
+                for item in items
+            ],
+        ).scalars()
+    )
 
-        db.commit()
-        db.refresh(db_item)
+    links = [
+        {"item_id": item_id, "tag_id": tag_ids[name]}
+        for item_id, item in zip(item_ids, items)
+        for name in dict.fromkeys(item.tags)
+    ]
+    if links:
+        db.execute(insert(models.item_tags), links)
+        _refresh_search_tags(db, [item_id for item_id, item in zip(item_ids, items) if item.tags])
 
-    return db_item
+    with tag_index.writing():
+        db.commit()
+        data_versions.bump("items")
+        tag_index.apply(tag_ids, Counter(link["tag_id"] for link in links))
+    events.publish("item", None, "create", version)
+    return {"created": len(item_ids), "tags_created": tags_created}
+
+def iter_items_for_export(db: Session, batch_size: int = 500) -> Iterator[list[dict]]:
+    """
+    Yields every item as a plain dict (ItemCreate fields plus id/created_at,
+    tags as names), in lists of up to batch_size streamed from one query.
+    """
+    columns = ["id", *ITEM_FIELDS, "created_at"]
+    query = (
+        select(*(getattr(models.Item, column) for column in columns), _item_tags_json())
+        .order_by(models.Item.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for batch in db.execute(query).partitions():
+        rows = []
+        for row in batch:
+            item = dict(zip(columns, row))
+            item["created_at"] = item["created_at"].isoformat()
+            item["tags"] = [tag["name"] for tag in orjson.loads(row.tags)]
+            rows.append(item)
+        yield rows
 
 def update_item(db: Session, item_id: int, payload: schemas.ItemUpdate):
     db_item = db.get(models.Item, item_id)
     if not db_item:
         return None
 
-    for field in [
-        "name",
-        "color",
-        "fit",
-        "brand",
-        "notes",
-        "season",
-        "rating",
-        "category_id",
-        "location_id",
-        "image_url",
-    ]:
+    version = _next_sync_version(db)
+    db_item.version = version
+    tag_ids, deltas = {}, Counter()
+
+    for field in ITEM_FIELDS:
         value = getattr(payload, field)
         if value is not None:
             setattr(db_item, field, value)
 
     if payload.tags is not None:
-        db_item.tags.clear()
-        for tag_name in payload.tags:
-            tag = (
-                db.query(models.Tag)
-                .filter(models.Tag.name == tag_name)
-                .first()
+        # diff against the association rows so unchanged tags write nothing
+        tag_ids, _ = _resolve_tag_ids(db, payload.tags, version)
+        wanted = set(tag_ids.values())
+        current = set(
+            db.scalars(
+                select(models.item_tags.c.tag_id).where(
+                    models.item_tags.c.item_id == item_id
+                )
             )
-            if not tag:
-                tag = models.Tag(name=tag_name)
-                db.add(tag)
-                db.flush()
-            if tag not in db_item.tags:
-                db_item.tags.append(tag)
+        )
+
+        removed = current - wanted
+        deltas.update({tag_id: -1 for tag_id in removed})
+        deltas.update({tag_id: 1 for tag_id in wanted - current})
+        if removed:
+            db.execute(
+                delete(models.item_tags).where(
+                    models.item_tags.c.item_id == item_id,
+                    models.item_tags.c.tag_id.in_(removed),
+                )
+            )
+        added = wanted - current
+        if added:
+            db.execute(
+                insert(models.item_tags),
+                [{"item_id": item_id, "tag_id": tag_id} for tag_id in added],
+            )
+        if removed or added:
+            _refresh_search_tags(db, [item_id])
 
-    db.commit()
+    with tag_index.writing():
+        db.commit()
+        data_versions.bump("items")
+        tag_index.apply(tag_ids, deltas)
+    events.publish("item", item_id, "update", version)
     db.refresh(db_item)
     return db_item
 
+def _in_json_list(column, values: list):
+    # one bound parameter however many values: sidesteps SQLite's variable
+    # limit without chunking the statement
+    return column.in_(
+        select(literal_column("value")).select_from(func.json_each(orjson.dumps(values).decode()))
+    )
+
+def batch_update_items(
+    db: Session,
+    ids: list[int],
+    changes: schemas.ItemUpdate,
+    add_tags: list[str] = (),
+    remove_tags: list[str] = (),
+):
+    """
+    Applies one partial update and tag edits to many items in a single
+    transaction, one set-based statement per step. Raises LookupError (and
+    changes nothing) if any id does not exist. Returns the updated items
+    shaped like get_item_rows.
+    """
+    ids = list(dict.fromkeys(ids))
+    found = set(db.scalars(select(models.Item.id).where(_in_json_list(models.Item.id, ids))))
+    missing = [item_id for item_id in ids if item_id not in found]
+    if missing:
+        raise LookupError(f"Items not found: {missing[:20]}")
+
+    version = _next_sync_version(db)
+    values = {field: getattr(changes, field) for field in ITEM_FIELDS if getattr(changes, field) is not None}
+    # tag edits bump the version too, so sync clients refetch the items
+    db.execute(
+        update(models.Item)
+        .where(_in_json_list(models.Item.id, ids))
+        .values(**values, version=version)
+        .execution_options(synchronize_session=False)
+    )
+
+    link = models.item_tags.c
+
+    def link_all(tag_ids):
+        # every (item, tag) pair in one INSERT ... SELECT; existing links are skipped
+        db.execute(
+            insert(models.item_tags)
+            .prefix_with("OR IGNORE")
+            .from_select(
+                ["item_id", "tag_id"],
+                select(models.Item.id, models.Tag.id)
+                .select_from(models.Item)
+                .join(models.Tag, true())  # the cross product is intended
+                .where(_in_json_list(models.Item.id, ids), _in_json_list(models.Tag.id, tag_ids)),
+            )
+        )
+
+    if changes.tags is not None:
+        wanted = list(_resolve_tag_ids(db, changes.tags, version)[0].values())
+        db.execute(
+            delete(models.item_tags).where(
+                _in_json_list(link.item_id, ids), ~_in_json_list(link.tag_id, wanted)
+            )
+        )
+        if wanted:
+            link_all(wanted)
+
+    if add_tags:
+        link_all(list(_resolve_tag_ids(db, add_tags, version)[0].values()))
+
+    if remove_tags:
+        db.execute(
+            delete(models.item_tags).where(
+                _in_json_list(link.item_id, ids),
+                link.tag_id.in_(
+                    select(models.Tag.id).where(_in_json_list(models.Tag.name, list(remove_tags)))
+                ),
+            )
+        )
+
+    if changes.tags is not None or add_tags or remove_tags:
+        _refresh_search_tags(db, ids)
+
+    db.commit()
+    data_versions.bump("items")
+    # set-based: the per-tag count changes are not known here
+    tag_index.invalidate()
+    events.publish("item", None, "update", version)
+
+    rows = db.execute(
+        select(*(getattr(models.Item, column) for column in ITEM_OUT_COLUMNS), _item_tags_json())
+        .where(_in_json_list(models.Item.id, ids))
+        .order_by(models.Item.id)
+    )
+    return _item_row_dicts(rows)
+
 def delete_item(db: Session, item_id: int):
     item = db.get(models.Item, item_id)
     if not item:
         return None
 
+    # take the write lock before reading the links, so no concurrent
+    # update_item can change them before the counts are applied
+    version = _next_sync_version(db)
+    tag_ids = db.scalars(
+        select(models.item_tags.c.tag_id).where(models.item_tags.c.item_id == item_id)
+    ).all()
+    _log_deletion(db, "item", item_id, version)
     db.delete(item)
-    db.commit()
+    with tag_index.writing():
+        db.commit()
+        data_versions.bump("items")
+        tag_index.apply({}, Counter({tag_id: -1 for tag_id in tag_ids}))
+    events.publish("item", item_id, "delete", version)
     return item
 
+# ---------- ITEM COUNTS ----------
+
+def _with_item_counts(db: Session, model, item_column, order_by):
+    """
+    Rows of `model` as dicts plus item_count, counted for the whole list by
+    one grouped subquery over `item_column`'s index.
+    """
+    rows = db.execute(_item_counts_query(model, item_column, order_by))
+    return [dict(row._mapping) for row in rows]
+
+def _item_counts_query(model, item_column, order_by):
+    counts = (
+        select(item_column.label("owner_id"), func.count().label("item_count"))
+        .where(item_column.is_not(None))
+        .group_by(item_column)
+        .subquery()
+    )
+    return (
+        select(model.__table__, func.coalesce(counts.c.item_count, 0).label("item_count"))
+        .outerjoin(counts, counts.c.owner_id == model.id)
+        .order_by(order_by)
+    )
+
+def _has_items(db: Session, item_column, owner_id: int) -> bool:
+    return db.scalar(_has_items_query(item_column, owner_id))
+
+def _has_items_query(item_column, owner_id: int):
+    return select(exists().where(item_column == owner_id))
+
 # ---------- LOCATIONS ----------
 
-def get_locations(db: Session):
+def get_locations(db: Session, with_counts: bool = False):
+    if with_counts:
+        return _with_item_counts(db, models.Location, models.Item.location_id, models.Location.id)
     return db.query(models.Location).all()
 
 def create_location(db: Session, location: schemas.LocationCreate):
-    db_loc = models.Location(**location.dict())
+    db_loc = models.Location(**location.dict(), version=_next_sync_version(db))
     db.add(db_loc)
     db.commit()
+    data_versions.bump("locations")
     db.refresh(db_loc)
+    events.publish("location", db_loc.id, "create", db_loc.version)
     return db_loc
 
 def update_location(db: Session, location_id: int, payload: schemas.LocationUpdate):
@@ -117,6 +636,7 @@ def update_location(db: Session, location_id: int, payload: schemas.LocationUpda
     if not loc:
         return None
 
+    loc.version = _next_sync_version(db)
     for field in [
         "name",
         "description",
@@ -131,7 +651,9 @@ def update_location(db: Session, location_id: int, payload: schemas.LocationUpda
             setattr(loc, field, value)
 
     db.commit()
+    data_versions.bump("locations")
     db.refresh(loc)
+    events.publish("location", loc.id, "update", loc.version)
     return loc
 
 def delete_location(db: Session, location_id: int):
@@ -139,27 +661,51 @@ def delete_location(db: Session, location_id: int):
     if not loc:
         return None
 
-    # detach items to avoid FK errors (location_id uses ondelete SET NULL but SQLite needs explicit change)
-    db.query(models.Item).filter(models.Item.location_id == location_id).update(
-        {"location_id": None}
-    )
+    version = _next_sync_version(db)
 
+    # ON DELETE SET NULL would detach the items too, but they also need a
+    # new version so sync clients see the change. One UPDATE over
+    # ix_items_location_id; no items are loaded into the session
+    detached = db.execute(_detach_location_query(location_id, version)).rowcount
+
+    _log_deletion(db, "location", location_id, version)
     db.delete(loc)
     db.commit()
+    data_versions.bump("locations", *(["items"] if detached else []))
+    events.publish("location", location_id, "delete", version)
+    if detached:
+        events.publish("item", None, "update", version)
     return loc
 
 
+def _detach_location_query(location_id: int, version: int):
+    return (
+        update(models.Item)
+        .where(models.Item.location_id == location_id)
+        .values(location_id=None, version=version)
+        .execution_options(synchronize_session=False)
+    )
+
+
 # ---------- CATEGORIES ----------
 
-def get_categories(db: Session):
+def get_categories(db: Session, with_counts: bool = False):
+    if with_counts:
+        return _with_item_counts(db, models.Category, models.Item.category_id, models.Category.name)
     return db.query(models.Category).order_by(models.Category.name).all()
 
 
 def create_category(db: Session, category: schemas.CategoryCreate):
-    db_category = models.Category(name=category.name, comments=category.comments)
+    db_category = models.Category(
+        name=category.name,
+        comments=category.comments,
+        version=_next_sync_version(db),
+    )
     db.add(db_category)
     db.commit()
+    data_versions.bump("categories")
     db.refresh(db_category)
+    events.publish("category", db_category.id, "create", db_category.version)
     return db_category
 
 def update_category(db: Session, category_id: int, payload: schemas.CategoryUpdate):
@@ -167,28 +713,231 @@ def update_category(db: Session, category_id: int, payload: schemas.CategoryUpda
     if not category:
         return None
 
+    category.version = _next_sync_version(db)
     for field in ["name", "comments"]:
         value = getattr(payload, field)
         if value is not None:
             setattr(category, field, value)
 
     db.commit()
+    data_versions.bump("categories")
     db.refresh(category)
+    events.publish("category", category.id, "update", category.version)
     return category
 
 
 def delete_category(db: Session, category_id: int):
-    category = (
-        db.query(models.Category)
-        .filter(models.Category.id == category_id)
-        .first()
-    )
+    category = db.get(models.Category, category_id)
     if not category:
         return None
 
-    if category.items:
+    # EXISTS stops at the first index entry instead of loading every item
+    if _has_items(db, models.Item.category_id, category_id):
         raise ValueError("Cannot delete category with existing items")
 
+    version = _next_sync_version(db)
+    _log_deletion(db, "category", category_id, version)
     db.delete(category)
     db.commit()
+    data_versions.bump("categories")
+    events.publish("category", category_id, "delete", version)
     return category
+
+# ---------- TAGS ----------
+
+def load_tag_index(db: Session) -> TagIndex:
+    """
+    Builds the in-memory autocomplete index (tag_index) from the database.
+    If a write overlapped, tag_index stays unloaded and the rows are
+    returned in a standalone index, so the caller can still answer.
+    """
+    generation = tag_index.generation
+    rows = [
+        (row["id"], row["name"], row["item_count"])
+        for row in _with_item_counts(db, models.Tag, models.item_tags.c.tag_id, models.Tag.id)
+    ]
+    if tag_index.load(rows, generation):
+        return tag_index
+    index = TagIndex()
+    index.load(rows, index.generation)
+    return index
+
+def _touch_tagged_items(db: Session, tag_ids: list[int], version: int) -> list[int]:
+    # items embed their tag names, so sync clients must refetch them
+    return db.scalars(
+        update(models.Item)
+        .where(
+            models.Item.id.in_(
+                select(models.item_tags.c.item_id).where(models.item_tags.c.tag_id.in_(tag_ids))
+            )
+        )
+        .values(version=version)
+        .returning(models.Item.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+def rename_tag(db: Session, tag_id: int, payload: schemas.TagUpdate):
+    tag = db.get(models.Tag, tag_id)
+    if not tag:
+        return None
+
+    old_name = tag.name
+    version = _next_sync_version(db)
+    _touch_tagged_items(db, [tag_id], version)
+    # items_fts_tag_au rewrites the search rows of the tagged items
+    db.execute(
+        update(models.Tag)
+        .where(models.Tag.id == tag_id)
+        .values(name=payload.name, version=version)
+    )
+    db.commit()
+    tag_id_cache.invalidate([old_name, payload.name])
+    data_versions.bump("tags", "items")
+    tag_index.rename(tag_id, payload.name)
+    events.publish("tag", tag_id, "update", version)
+    db.refresh(tag)
+    return tag
+
+def merge_tags(db: Session, source_ids: list[int], target_id: int):
+    """
+    Moves every item tagged with one of source_ids to target_id and deletes
+    the source tags. Raises LookupError if any of the tags does not exist.
+    """
+    target = db.get(models.Tag, target_id)
+    if not target:
+        raise LookupError(f"Tag {target_id} not found")
+
+    source_ids = [tag_id for tag_id in dict.fromkeys(source_ids) if tag_id != target_id]
+    sources = dict(
+        db.execute(
+            select(models.Tag.id, models.Tag.name).where(models.Tag.id.in_(source_ids))
+        ).tuples().all()
+    )
+    missing = [tag_id for tag_id in source_ids if tag_id not in sources]
+    if missing:
+        raise LookupError(f"Tags not found: {missing}")
+    if not source_ids:
+        return target
+
+    link = models.item_tags.c
+    version = _next_sync_version(db)
+    moved = _touch_tagged_items(db, source_ids, version)
+    db.execute(
+        insert(models.item_tags)
+        .prefix_with("OR IGNORE")
+        .from_select(
+            ["item_id", "tag_id"],
+            select(link.item_id, literal(target_id)).where(link.tag_id.in_(source_ids)),
+        )
+    )
+    # the sources' item_tags rows go with ON DELETE CASCADE
+    db.execute(
+        delete(models.Tag)
+        .where(models.Tag.id.in_(source_ids))
+        .execution_options(synchronize_session=False)
+    )
+    _refresh_search_tags(db, moved)
+    db.execute(
+        insert(models.Deletion),
+        [{"entity": "tag", "entity_id": tag_id, "version": version} for tag_id in source_ids],
+    )
+    db.commit()
+    tag_id_cache.invalidate(sources.values())
+    data_versions.bump("tags", "items")
+    # the target's new count depends on how many items already had it
+    tag_index.invalidate()
+    for tag_id in source_ids:
+        events.publish("tag", tag_id, "delete", version)
+    events.publish("item", None, "update", version)
+    db.refresh(target)
+    return target
+
+# ---------- STATS ----------
+
+def _average(value) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+def _value_counts(db: Session, column):
+    # season / brand: one pass over the column's index
+    rows = db.execute(
+        select(column, func.count(), func.avg(models.Item.rating))
+        .group_by(column)
+        .order_by(func.count().desc(), column)
+    )
+    return [
+        {"value": value, "count": count, "average_rating": _average(average)}
+        for value, count, average in rows
+    ]
+
+def get_stats(db: Session):
+    """
+    Dashboard aggregates, each one GROUP BY query. Categories and locations
+    include the empty ones; items without a location are counted under
+    locations as id None.
+    """
+    total, rated, average = db.execute(
+        select(func.count(), func.count(models.Item.rating), func.avg(models.Item.rating))
+    ).one()
+
+    ratings = dict(
+        db.execute(
+            select(models.Item.rating, func.count())
+            .where(models.Item.rating.is_not(None))
+            .group_by(models.Item.rating)
+        ).tuples().all()
+    )
+
+    categories = db.execute(
+        select(
+            models.Category.id,
+            models.Category.name,
+            func.count(models.Item.id),
+            func.avg(models.Item.rating),
+        )
+        .outerjoin(models.Item, models.Item.category_id == models.Category.id)
+        .group_by(models.Category.id)
+        .order_by(models.Category.name)
+    )
+
+    locations = db.execute(
+        select(
+            models.Location.id,
+            models.Location.name,
+            func.count(models.Item.id),
+            func.avg(models.Item.rating),
+        )
+        .outerjoin(models.Item, models.Item.location_id == models.Location.id)
+        .group_by(models.Location.id)
+        .order_by(models.Location.name)
+    ).all()
+    unassigned, unassigned_average = db.execute(
+        select(func.count(), func.avg(models.Item.rating)).where(models.Item.location_id.is_(None))
+    ).one()
+    if unassigned:
+        locations.append((None, None, unassigned, unassigned_average))
+
+    tag_count = func.count().label("count")
+    tags = db.execute(
+        select(models.Tag.id, models.Tag.name, tag_count)
+        .join(models.item_tags, models.item_tags.c.tag_id == models.Tag.id)
+        .group_by(models.Tag.id)
+        .order_by(tag_count.desc(), models.Tag.name)
+    )
+
+    return {
+        "total_items": total,
+        "rated_items": rated,
+        "average_rating": _average(average),
+        "ratings": {str(rating): count for rating, count in sorted(ratings.items())},
+        "categories": [
+            {"id": id_, "name": name, "count": count, "average_rating": _average(avg)}
+            for id_, name, count, avg in categories
+        ],
+        "locations": [
+            {"id": id_, "name": name, "count": count, "average_rating": _average(avg)}
+            for id_, name, count, avg in locations
+        ],
+        "seasons": _value_counts(db, models.Item.season),
+        "brands": _value_counts(db, models.Item.brand),
+        "tags": [{"id": id_, "name": name, "count": count} for id_, name, count in tags],
+    }
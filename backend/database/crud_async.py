@@ -0,0 +1,118 @@
+"""
+Awaitable versions of the functions in crud.py, for async routers.
+
+Each one runs the sync implementation without blocking the event loop:
+on an AsyncSession (WARDROBE_DB_MODE=async) through AsyncSession.run_sync,
+on a plain Session in the threadpool. Keeping a single implementation
+means both modes always issue the same SQL. With WARDROBE_WRITE_MODE=batched
+writes go to the writer thread instead (see writer.py).
+"""
+import asyncio
+from functools import partial
+
+from starlette.concurrency import run_in_threadpool
+
+from . import crud
+from .writer import WRITE_MODE, writer
+
+
+async def run(db, fn, *args, **kwargs):
+    """Runs fn(session, *args, **kwargs) for either session flavor."""
+    # duck-typed so sqlalchemy.ext.asyncio is only imported in async mode
+    if hasattr(db, "run_sync"):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(partial(fn, db, *args, **kwargs))
+
+
+async def write(db, fn, *args, **kwargs):
+    """Like run(), but through the batched writer when it is enabled."""
+    if WRITE_MODE == "batched":
+        return await asyncio.wrap_future(writer.submit(fn, *args, **kwargs))
+    return await run(db, fn, *args, **kwargs)
+
+
+def _with_tags(fn):
+    # response serialization reads item.tags; load it while IO is still allowed
+    def call(db, *args, **kwargs):
+        item = fn(db, *args, **kwargs)
+        if item is not None:
+            item.tags
+        return item
+    return call
+
+
+async def rollback(db):
+    await run(db, lambda session: session.rollback())
+
+
+# ---------- ITEMS ----------
+
+async def get_item_rows(db, **kwargs):
+    return await run(db, crud.get_item_rows, **kwargs)
+
+async def search_items(db, **kwargs):
+    return await run(db, crud.search_items, **kwargs)
+
+async def create_item(db, **kwargs):
+    return await write(db, _with_tags(crud.create_item), **kwargs)
+
+async def bulk_create_items(db, **kwargs):
+    return await write(db, crud.bulk_create_items, **kwargs)
+
+async def update_item(db, **kwargs):
+    return await write(db, _with_tags(crud.update_item), **kwargs)
+
+async def batch_update_items(db, **kwargs):
+    return await write(db, crud.batch_update_items, **kwargs)
+
+async def delete_item(db, **kwargs):
+    return await write(db, crud.delete_item, **kwargs)
+
+# ---------- LOCATIONS ----------
+
+async def get_locations(db, **kwargs):
+    return await run(db, crud.get_locations, **kwargs)
+
+async def create_location(db, **kwargs):
+    return await write(db, crud.create_location, **kwargs)
+
+async def update_location(db, **kwargs):
+    return await write(db, crud.update_location, **kwargs)
+
+async def delete_location(db, **kwargs):
+    return await write(db, crud.delete_location, **kwargs)
+
+# ---------- CATEGORIES ----------
+
+async def get_categories(db, **kwargs):
+    return await run(db, crud.get_categories, **kwargs)
+
+async def create_category(db, **kwargs):
+    return await write(db, crud.create_category, **kwargs)
+
+async def update_category(db, **kwargs):
+    return await write(db, crud.update_category, **kwargs)
+
+async def delete_category(db, **kwargs):
+    return await write(db, crud.delete_category, **kwargs)
+
+# ---------- TAGS ----------
+
+async def load_tag_index(db, **kwargs):
+    return await run(db, crud.load_tag_index, **kwargs)
+
+async def rename_tag(db, **kwargs):
+    return await write(db, crud.rename_tag, **kwargs)
+
+async def merge_tags(db, **kwargs):
+    return await write(db, crud.merge_tags, **kwargs)
+
+# ---------- SYNC ----------
+
+async def get_changes(db, **kwargs):
+    return await run(db, crud.get_changes, **kwargs)
+
+# ---------- STATS ----------
+
+async def get_stats(db, **kwargs):
+    return await run(db, crud.get_stats, **kwargs)
@@ -1,13 +1,19 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
 from platformdirs import user_data_dir
+from dotenv import load_dotenv
 import os
 
+from backend.database import query_guard
+
+load_dotenv()
+
 APP_NAME = "MyWardrobe"
 APP_AUTHOR = "MyWardrobe"  # can be same as name
 
-# 1. Resolve OS-specific user data directory
-data_dir = user_data_dir(APP_NAME, APP_AUTHOR)
+# 1. Resolve OS-specific user data directory (overridable for dev / benchmarks)
+data_dir = os.getenv("WARDROBE_DATA_DIR") or user_data_dir(APP_NAME, APP_AUTHOR)
 
 # 2. Ensure directory exists
 os.makedirs(data_dir, exist_ok=True)
@@ -18,11 +24,56 @@ db_path = os.path.join(data_dir, "wardrobe.db")
 # 4. SQLite URL
 DATABASE_URL = f"sqlite:///{db_path}"
 
+# 5. Per-connection PRAGMA profiles, picked with WARDROBE_DB_PROFILE
+SQLITE_PROFILES = {
+    # WAL lets readers run alongside the single writer; NORMAL sync is
+    # durable across app crashes (only an OS crash can lose the last commit)
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "foreign_keys": "ON",
+        "cache_size": -64000,  # negative = KiB, i.e. 64 MB
+        "mmap_size": 268435456,  # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # SQLite defaults, with foreign keys enforced
+    "safe": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "foreign_keys": "ON",
+        "busy_timeout": 5000,
+    },
+}
+
+DB_PROFILE = os.getenv("WARDROBE_DB_PROFILE", "performance")
+if DB_PROFILE not in SQLITE_PROFILES:
+    raise ValueError(
+        f"Unknown WARDROBE_DB_PROFILE {DB_PROFILE!r}, "
+        f"expected one of {sorted(SQLITE_PROFILES)}"
+    )
+
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False},
+    poolclass=QueuePool,
+    pool_size=int(os.getenv("WARDROBE_DB_POOL_SIZE", "5")),
+    max_overflow=int(os.getenv("WARDROBE_DB_MAX_OVERFLOW", "10")),
+    pool_timeout=float(os.getenv("WARDROBE_DB_POOL_TIMEOUT", "30")),
 )
 
+
+@event.listens_for(engine, "connect")
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PROFILES[DB_PROFILE].items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+# debug-only N+1 detection (WARDROBE_QUERY_GUARD), a no-op by default
+query_guard.attach(engine)
+
 SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
 
@@ -32,3 +83,34 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# 6. Optional async stack (WARDROBE_DB_MODE=async, needs aiosqlite)
+DB_MODE = os.getenv("WARDROBE_DB_MODE", "sync")
+if DB_MODE not in ("sync", "async"):
+    raise ValueError(f"Unknown WARDROBE_DB_MODE {DB_MODE!r}, expected 'sync' or 'async'")
+
+async_engine = None
+AsyncSessionLocal = None
+
+if DB_MODE == "async":
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}",
+        pool_size=int(os.getenv("WARDROBE_DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("WARDROBE_DB_MAX_OVERFLOW", "10")),
+        pool_timeout=float(os.getenv("WARDROBE_DB_POOL_TIMEOUT", "30")),
+    )
+    event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    query_guard.attach(async_engine.sync_engine)
+
+    # objects returned by crud must stay readable after commit without IO
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# the session dependency routers use, picked once at startup
+get_session = get_async_db if DB_MODE == "async" else get_db
@@ -1,25 +1,11 @@
 from backend.database.database import engine, SessionLocal
 from backend.database import models
+from backend.database.migrations import migrate
+from backend.database.seed import DEFAULT_CATEGORIES
 from sqlalchemy import inspect
 
 # ---------- SEED DATA ----------
 
-DEFAULT_CATEGORIES = [
-    "T-Shirts",
-    "Shirts",
-    "Polos",
-    "Tank Tops",
-    "Hoodies",
-    "Sweatshirts",
-    "Jackets",
-    "Pants",
-    "Jeans",
-    "Shorts",
-    "Shoes",
-    "Accessories",
-]
-
-
 def seed_categories(db):
     for name in DEFAULT_CATEGORIES:
         exists = (
@@ -34,8 +20,8 @@ def seed_categories(db):
 def init_db():
     print("Running init_db...")
 
-    print("Creating all tables...")
-    models.Base.metadata.create_all(bind=engine)
+    print("Running migrations...")
+    migrate()
 
     db = SessionLocal()
 
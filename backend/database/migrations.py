@@ -0,0 +1,288 @@
+from typing import Callable, List, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateTable
+
+from backend.database.database import DB_PROFILE, SQLITE_PROFILES, engine
+from backend.database.models import Base
+
+# The database records the last migration it ran under this AppMeta key.
+# Steps run in order, each in its own transaction together with the marker
+# update, so a failed step leaves the database at the previous version.
+#
+# Rules for new steps:
+# - append only, never renumber or edit a released step
+# - a fresh database gets every table in its current shape from step 1, so
+#   later steps must check before they change anything (column present,
+#   IF NOT EXISTS, ...)
+# - use rebuild_table() for changes SQLite's ALTER TABLE cannot make
+SCHEMA_KEY = "schema_version"
+SYNC_VERSION_KEY = "sync_version"
+
+
+# ---------- FULL-TEXT SEARCH ----------
+
+# tag names of one item, space separated
+_ITEM_TAG_NAMES = """(
+    SELECT group_concat(tags.name, ' ')
+    FROM item_tags JOIN tags ON tags.id = item_tags.tag_id
+    WHERE item_tags.item_id = {item_id}
+)"""
+
+SEARCH_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+        name, brand, color, notes, tags,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts (rowid, name, brand, color, notes, tags)
+        VALUES (new.id, new.name, new.brand, new.color, new.notes,
+                {_ITEM_TAG_NAMES.format(item_id="new.id")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS items_fts_au
+    AFTER UPDATE OF name, brand, color, notes ON items BEGIN
+        DELETE FROM items_fts WHERE rowid = old.id;
+        INSERT INTO items_fts (rowid, name, brand, color, notes, tags)
+        VALUES (new.id, new.name, new.brand, new.color, new.notes,
+                {_ITEM_TAG_NAMES.format(item_id="new.id")});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN
+        DELETE FROM items_fts WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS items_fts_tag_au AFTER UPDATE OF name ON tags BEGIN
+        UPDATE items_fts SET tags = {_ITEM_TAG_NAMES.format(item_id="items_fts.rowid")}
+        WHERE rowid IN (SELECT item_id FROM item_tags WHERE tag_id = new.id);
+    END
+    """,
+]
+
+# items_fts.tags of the items selected by the {item_ids} subquery; crud runs
+# it once per write that changes item_tags (item_tags has no search triggers)
+REFRESH_SEARCH_TAGS = f"""
+    UPDATE items_fts SET tags = {_ITEM_TAG_NAMES.format(item_id="items_fts.rowid")}
+    WHERE rowid IN ({{item_ids}})
+"""
+
+SEARCH_INDEX_BACKFILL = [
+    "DELETE FROM items_fts",
+    f"""
+    INSERT INTO items_fts (rowid, name, brand, color, notes, tags)
+    SELECT id, name, brand, color, notes, {_ITEM_TAG_NAMES.format(item_id="items.id")}
+    FROM items
+    """,
+]
+
+# ---------- STEPS ----------
+
+def _create_tables(conn: Connection):
+    # checkfirst: tables that already exist are left alone
+    Base.metadata.create_all(bind=conn)
+
+
+SYNCED_TABLES = ["items", "locations", "categories", "tags"]
+
+
+def _add_sync_columns(conn: Connection):
+    """version / updated_at (models.SyncMixin) and the global sync counter."""
+    inspector = inspect(conn)
+    for table in SYNCED_TABLES:
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        if "version" not in columns:
+            conn.execute(text(
+                f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+            ))
+        if "updated_at" not in columns:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN updated_at DATETIME"))
+
+    conn.execute(
+        text("INSERT OR IGNORE INTO app_meta (key, value) VALUES (:key, '0')"),
+        {"key": SYNC_VERSION_KEY},
+    )
+
+
+def _create_indexes(conn: Connection):
+    # create_all() only builds indexes together with new tables
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
+def _create_search_index(conn: Connection):
+    """
+    items_fts, its sync triggers, and a backfill from the existing rows.
+    item_tags has no triggers: crud runs REFRESH_SEARCH_TAGS once per write
+    that changes links, rather than rewriting a search row per link.
+    """
+    for statement in SEARCH_INDEX_DDL + SEARCH_INDEX_BACKFILL:
+        conn.execute(text(statement))
+
+
+def _autoincrement_ids(conn: Connection):
+    """
+    AUTOINCREMENT on the synced tables, so SQLite never hands out a deleted
+    id again: a sync client holding its tombstone would delete the new row.
+    """
+    inspector = inspect(conn)
+    rebuild = [
+        table
+        for table in SYNCED_TABLES
+        if "AUTOINCREMENT" not in conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :table"),
+            {"table": table},
+        ).scalar().upper()
+    ]
+    if rebuild:
+        # the search triggers read items, item_tags and tags together, so a
+        # rename fails while any of them is missing; recreated below
+        for trigger in ("items_fts_ai", "items_fts_au", "items_fts_ad", "items_fts_tag_au"):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+
+    for table in rebuild:
+        model = Base.metadata.tables[table]
+        present = {column["name"] for column in inspector.get_columns(table)}
+        rebuild_table(
+            conn,
+            table,
+            str(CreateTable(model).compile(dialect=conn.dialect)).replace(
+                f"CREATE TABLE {table} ", f"CREATE TABLE {table}_new ", 1
+            ),
+            [column.name for column in model.columns if column.name in present],
+        )
+
+    if rebuild:
+        for statement in SEARCH_INDEX_DDL:
+            conn.execute(text(statement))
+
+    # start past every id in use or already deleted
+    for table, entity in zip(SYNCED_TABLES, ["item", "location", "category", "tag"]):
+        conn.execute(
+            text(
+                "INSERT INTO sqlite_sequence (name, seq) SELECT :table, 0 "
+                "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = :table)"
+            ),
+            {"table": table},
+        )
+        conn.execute(
+            text(
+                f"UPDATE sqlite_sequence SET seq = max(seq, "
+                f"(SELECT coalesce(max(id), 0) FROM {table}), "
+                f"(SELECT coalesce(max(entity_id), 0) FROM deletions WHERE entity = :entity)) "
+                f"WHERE name = :table"
+            ),
+            {"table": table, "entity": entity},
+        )
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "create tables", _create_tables),
+    (2, "sync columns", _add_sync_columns),
+    (3, "indexes", _create_indexes),
+    (4, "full-text search", _create_search_index),
+    (5, "autoincrement ids", _autoincrement_ids),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ---------- TABLE REBUILD ----------
+
+def rebuild_table(conn: Connection, table: str, create_sql: str, columns: List[str]):
+    """
+    SQLite's batch pattern for changes ALTER TABLE cannot make (constraints,
+    column types, dropping a column that is indexed or referenced):
+    create the new table, copy `columns` over, drop the old one, rename, then
+    recreate the old table's indexes and triggers.
+
+    `create_sql` must create a table called `<table>_new`. Drop indexes on
+    columns that go away before calling it. Call it from a migration step;
+    migrate() already runs with foreign keys off and checks them before
+    committing.
+    """
+    dependents = conn.execute(
+        text(
+            "SELECT sql FROM sqlite_master "
+            "WHERE tbl_name = :table AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+        ),
+        {"table": table},
+    ).scalars().all()
+
+    column_list = ", ".join(columns)
+    conn.execute(text(create_sql))
+    conn.execute(text(
+        f"INSERT INTO {table}_new ({column_list}) SELECT {column_list} FROM {table}"
+    ))
+    conn.execute(text(f"DROP TABLE {table}"))
+    conn.execute(text(f"ALTER TABLE {table}_new RENAME TO {table}"))
+
+    for sql in dependents:
+        conn.execute(text(sql))
+
+
+# ---------- RUNNER ----------
+
+def _current_version(conn: Connection) -> int:
+    try:
+        value = conn.execute(
+            text("SELECT value FROM app_meta WHERE key = :key"), {"key": SCHEMA_KEY}
+        ).scalar()
+    except OperationalError:
+        # first run: not even app_meta exists yet
+        return 0
+    return int(value) if value else 0
+
+
+def migrate(bind: Engine = engine):
+    """
+    Brings the database up to LATEST_VERSION. When it is already there this
+    is a single primary-key lookup. `bind` defaults to the live database.
+    """
+    with bind.connect() as conn:
+        if _current_version(conn) >= LATEST_VERSION:
+            return
+        conn.rollback()
+
+        # the rebuild pattern needs foreign keys off, which only takes
+        # effect outside a transaction
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        conn.commit()
+        try:
+            for version, description, step in MIGRATIONS:
+                with conn.begin():
+                    # pysqlite does not open transactions for DDL by itself;
+                    # IMMEDIATE also serialises concurrent starters
+                    conn.exec_driver_sql("BEGIN IMMEDIATE")
+                    if _current_version(conn) >= version:
+                        continue
+
+                    step(conn)
+
+                    violations = conn.exec_driver_sql("PRAGMA foreign_key_check").all()
+                    if violations:
+                        raise RuntimeError(
+                            f"Migration {version} ({description}) broke foreign keys: "
+                            f"{violations[:5]}"
+                        )
+                    conn.execute(
+                        text(
+                            "INSERT INTO app_meta (key, value) VALUES (:key, :value) "
+                            "ON CONFLICT (key) DO UPDATE SET value = excluded.value"
+                        ),
+                        {"key": SCHEMA_KEY, "value": str(version)},
+                    )
+        finally:
+            conn.exec_driver_sql(
+                f"PRAGMA foreign_keys={SQLITE_PROFILES[DB_PROFILE]['foreign_keys']}"
+            )
+            conn.commit()
@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     Table,
     Float,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -26,11 +27,25 @@ item_tags = Table(
         ForeignKey("tags.id", ondelete="CASCADE"),
         primary_key=True,
     ),
+    # the PK covers item -> tags; this covers tag -> items
+    Index("ix_item_tags_tag_id_item_id", "tag_id", "item_id"),
 )
 
+# --- sync metadata ---
+# version is the global sync version of the last write that touched the row
+# (see crud._next_sync_version); columns are added to old databases by
+# migration 2 (migrations._add_sync_columns). Ids are AUTOINCREMENT so a
+# deleted id is never reused: clients hold tombstones for it (migration 5)
+SYNCED_TABLE_ARGS = {"sqlite_autoincrement": True}
+
+class SyncMixin:
+    version = Column(Integer, nullable=False, default=0, server_default="0", index=True)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=True)
+
 # --- Tag ---
-class Tag(Base):
+class Tag(SyncMixin, Base):
     __tablename__ = "tags"
+    __table_args__ = SYNCED_TABLE_ARGS
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
@@ -42,18 +57,22 @@ class Tag(Base):
     )
 
 # --- Category ---
-class Category(Base):
+class Category(SyncMixin, Base):
     __tablename__ = "categories"
+    __table_args__ = SYNCED_TABLE_ARGS
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
     comments = Column(String, nullable=True)
 
-    items = relationship("Item", back_populates="category")
+    # passive: deleting a category never loads its items (crud checks it is
+    # empty first, and the FK is ON DELETE RESTRICT)
+    items = relationship("Item", back_populates="category", passive_deletes=True)
 
 # --- Location ---
-class Location(Base):
+class Location(SyncMixin, Base):
     __tablename__ = "locations"
+    __table_args__ = SYNCED_TABLE_ARGS
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
@@ -66,11 +85,17 @@ class Location(Base):
     grid_x = Column(Integer, nullable=True)
     grid_y = Column(Integer, nullable=True)
 
-    items = relationship("Item", back_populates="location")
+    # passive: ON DELETE SET NULL detaches items without loading them
+    items = relationship("Item", back_populates="location", passive_deletes=True)
 
 # --- Item ---
-class Item(Base):
+class Item(SyncMixin, Base):
     __tablename__ = "items"
+    __table_args__ = (
+        # leftmost prefix also serves plain category_id lookups
+        Index("ix_items_category_season_brand", "category_id", "season", "brand"),
+        SYNCED_TABLE_ARGS,
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -80,9 +105,9 @@ class Item(Base):
     # descriptive
     color = Column(String, nullable=True)
     fit = Column(String, nullable=True)
-    brand = Column(String, nullable=True)
+    brand = Column(String, nullable=True, index=True)
     notes = Column(Text, nullable=True)
-    season = Column(String, nullable=True)  # e.g., summer, winter
+    season = Column(String, nullable=True, index=True)  # e.g., summer, winter
 
     # preference
     rating = Column(Integer, nullable=True)  # 1–5 stars
@@ -97,6 +122,7 @@ class Item(Base):
         Integer,
         ForeignKey("locations.id", ondelete="SET NULL"),
         nullable=True,
+        index=True,
     )
 
     category = relationship("Category", back_populates="items")
@@ -110,6 +136,7 @@ class Item(Base):
         DateTime,
         server_default=func.now(),
         nullable=False,
+        index=True,
     )
 
     # tags (use-context only)
@@ -117,8 +144,19 @@ class Item(Base):
         "Tag",
         secondary=item_tags,
         back_populates="items",
+        order_by="Tag.id",
+        passive_deletes=True,  # item_tags rows go with ON DELETE CASCADE
     )
 
+# --- Deletion log (tombstones for /api/sync) ---
+class Deletion(Base):
+    __tablename__ = "deletions"
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)  # item, location, category, tag
+    entity_id = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False, index=True)
+
 class AppMeta(Base):
     __tablename__ = "app_meta"
 
@@ -0,0 +1,159 @@
+"""
+Debug guard against N+1 query patterns, off by default.
+
+    WARDROBE_QUERY_GUARD=log|raise      what to do when a scope misbehaves
+    WARDROBE_QUERY_GUARD_MAX=25         statements allowed per scope
+    WARDROBE_QUERY_GUARD_REPEATS=5      same statement / same lazy relationship
+    WARDROBE_QUERY_GUARD_LAZY_ROWS=100  rows one lazy collection load may bring in
+
+A scope is one HTTP request (QueryGuardMiddleware) or any block wrapped in
+`query_scope()`, e.g. a script or CI check. Statements outside a scope are ignored.
+An executemany() counts as one statement, however many batches it is sent
+in, and never as a repeat.
+"raise" fails the offending statement with QueryBudgetExceeded, so CI runs
+(the benchmark, scripted checks) fail on the request that regressed.
+"""
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+GUARD_MODE = os.getenv("WARDROBE_QUERY_GUARD", "off")
+if GUARD_MODE not in ("off", "log", "raise"):
+    raise ValueError(f"Unknown WARDROBE_QUERY_GUARD {GUARD_MODE!r}, expected off, log or raise")
+
+MAX_STATEMENTS = int(os.getenv("WARDROBE_QUERY_GUARD_MAX", "25"))
+MAX_REPEATS = int(os.getenv("WARDROBE_QUERY_GUARD_REPEATS", "5"))
+MAX_LAZY_ROWS = int(os.getenv("WARDROBE_QUERY_GUARD_LAZY_ROWS", "100"))
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class _Scope:
+    __slots__ = ("label", "statements", "repeats", "lazy_loads", "reported", "batched")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.statements = 0
+        self.repeats: Counter = Counter()
+        self.lazy_loads: Counter = Counter()
+        self.reported: set = set()
+        self.batched = None
+
+
+_scope: ContextVar[Optional[_Scope]] = ContextVar("query_guard_scope", default=None)
+
+
+@contextmanager
+def query_scope(label: str):
+    token = _scope.set(_Scope(label))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def _violation(current: _Scope, kind: str, message: str):
+    message = f"{current.label}: {message}"
+    if GUARD_MODE == "raise":
+        raise QueryBudgetExceeded(message)
+    # log each kind of problem once per scope, not once per statement
+    if kind not in current.reported:
+        current.reported.add(kind)
+        logger.warning("Query guard: %s", message)
+
+
+# ---------- HOOKS ----------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    current = _scope.get()
+    if current is None:
+        return
+
+    if executemany:
+        # insertmanyvalues sends one executemany() in batches of the same
+        # statement; that is one bulk write, not a query in a loop
+        if context is current.batched:
+            return
+        current.batched = context
+
+    current.statements += 1
+    if current.statements > MAX_STATEMENTS:
+        _violation(current, "statements", f"more than {MAX_STATEMENTS} statements")
+    if executemany:
+        return
+
+    current.repeats[statement] += 1
+    if current.repeats[statement] == MAX_REPEATS:
+        _violation(
+            current,
+            f"repeat:{statement}",
+            f"same statement run {MAX_REPEATS} times (query in a loop?): {statement[:200]}",
+        )
+
+
+def _do_orm_execute(orm_execute_state):
+    current = _scope.get()
+    if (
+        current is None
+        or not orm_execute_state.is_select
+        or orm_execute_state.lazy_loaded_from is None
+    ):
+        return None
+
+    path = orm_execute_state.loader_strategy_path
+    relationship = str(path[-1]) if path else "relationship"
+    current.lazy_loads[relationship] += 1
+    if current.lazy_loads[relationship] == MAX_REPEATS:
+        _violation(
+            current,
+            f"lazy:{relationship}",
+            f"{relationship} lazy-loaded {MAX_REPEATS} times (N+1, use selectinload)",
+        )
+
+    # run the load here to see how many rows it pulls in, and hand the
+    # caller a replayable copy of the result
+    frozen = orm_execute_state.invoke_statement().freeze()
+    rows = len(frozen().all())
+    if rows > MAX_LAZY_ROWS:
+        _violation(
+            current,
+            f"rows:{relationship}",
+            f"{relationship} lazy-loaded {rows} rows (use an EXISTS or COUNT query)",
+        )
+    return frozen()
+
+
+def attach(engine):
+    """Installs the guard on `engine` (and on ORM sessions, for lazy loads)."""
+    if GUARD_MODE == "off":
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    # AsyncSession runs on a plain Session underneath, so this covers both stacks
+    if not event.contains(Session, "do_orm_execute", _do_orm_execute):
+        event.listen(Session, "do_orm_execute", _do_orm_execute)
+
+
+# ---------- MIDDLEWARE ----------
+
+class QueryGuardMiddleware:
+    """Opens one guard scope per HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with query_scope(f"{scope['method']} {scope['path']}"):
+            await self.app(scope, receive, send)
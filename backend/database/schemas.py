@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field, computed_field
+from typing import Optional, List, Dict
 from datetime import datetime
 
+from backend.images import thumbnail_urls
+
 
 # ---------- TAG ----------
 class TagOut(BaseModel):
@@ -11,6 +13,18 @@ class TagOut(BaseModel):
     class Config:
         from_attributes = True
 
+class TagCountOut(TagOut):
+    # GET /api/tags/, ranked by item_count
+    item_count: int
+
+class TagUpdate(BaseModel):
+    name: str = Field(min_length=1)
+
+class TagMerge(BaseModel):
+    # every item tagged with a source gets the target; sources are deleted
+    source_ids: List[int] = Field(min_length=1, max_length=100)
+    target_id: int
+
 # ---------- ITEM ----------
 
 class ItemBase(BaseModel):
@@ -61,9 +75,35 @@ class ItemOut(ItemBase):
     # OUTPUT: full tag objects
     tags: List[TagOut]
 
+    # size -> WebP URL, only for images uploaded through /api/images
+    @computed_field
+    @property
+    def thumbnails(self) -> Optional[Dict[str, str]]:
+        return thumbnail_urls(self.image_url)
+
     class Config:
         from_attributes = True
 
+class ItemBulkResult(BaseModel):
+    created: int
+    tags_created: int
+
+class ItemBatchUpdate(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=5000)
+
+    # applied to every item; None fields are left alone, tags (if given)
+    # replaces each item's tags
+    changes: ItemUpdate = ItemUpdate()
+
+    add_tags: List[str] = []
+    remove_tags: List[str] = []
+
+# ---------- IMAGE ----------
+
+class ImageOut(BaseModel):
+    url: str
+    thumbnails: Dict[str, str]
+
 # ---------- LOCATION ----------
 class LocationBase(BaseModel):
     name: str
@@ -94,6 +134,10 @@ class LocationOut(LocationBase):
     class Config:
         from_attributes = True
 
+class LocationCountOut(LocationOut):
+    # GET /api/locations/?with_counts=true
+    item_count: int
+
 
 # ---------- CATEGORY ----------
 
@@ -115,3 +159,87 @@ class CategoryOut(CategoryBase):
 
     class Config:
         from_attributes = True
+
+class CategoryCountOut(CategoryOut):
+    # GET /api/categories/?with_counts=true
+    item_count: int
+
+
+# ---------- SYNC ----------
+
+class DeletionOut(BaseModel):
+    entity: str        # item, location, category, tag
+    entity_id: int
+    version: int
+
+    class Config:
+        from_attributes = True
+
+class SyncOut(BaseModel):
+    # pass back as ?since= on the next sync
+    version: int
+
+    items: List[ItemOut]
+    locations: List[LocationOut]
+    categories: List[CategoryOut]
+    tags: List[TagOut]
+    deleted: List[DeletionOut]
+
+# ---------- STATS ----------
+
+class GroupStats(BaseModel):
+    # id/name of the category or location; None for items without a location
+    id: Optional[int]
+    name: Optional[str]
+    count: int
+    average_rating: Optional[float]
+
+class ValueStats(BaseModel):
+    value: Optional[str]
+    count: int
+    average_rating: Optional[float]
+
+class TagStats(BaseModel):
+    id: int
+    name: str
+    count: int
+
+class StatsOut(BaseModel):
+    total_items: int
+    rated_items: int
+    average_rating: Optional[float]
+    ratings: Dict[str, int]  # rating -> number of items
+
+    categories: List[GroupStats]
+    locations: List[GroupStats]
+    seasons: List[ValueStats]
+    brands: List[ValueStats]
+    tags: List[TagStats]  # most used first
+
+# ---------- BACKUP ----------
+
+class SnapshotOut(BaseModel):
+    name: str
+    created_at: datetime
+    size: int  # compressed database bytes
+    sync_version: Optional[int]
+    images: int
+
+class BackupJobOut(BaseModel):
+    id: str
+    kind: str      # backup, restore
+    state: str     # running, done, failed
+    phase: str
+    progress: float  # of the current phase, 0..1
+    snapshot: Optional[str]
+    undo_snapshot: Optional[str]
+    error: Optional[str]
+    started_at: datetime
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+class RestoreRequest(BaseModel):
+    # defaults to the newest snapshot
+    snapshot: Optional[str] = None
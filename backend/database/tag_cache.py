@@ -0,0 +1,48 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Iterable
+
+
+class TagIdCache:
+    """
+    Process-wide LRU mapping of tag name -> tag id.
+
+    Only ids read back from committed rows are stored. Tags inserted by the
+    current transaction are invalidated instead of cached, so a rollback can
+    never leave a dangling id behind.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._lock = Lock()
+
+    def get_many(self, names: Iterable[str]) -> dict[str, int]:
+        found = {}
+        with self._lock:
+            for name in names:
+                tag_id = self._entries.get(name)
+                if tag_id is not None:
+                    self._entries.move_to_end(name)
+                    found[name] = tag_id
+        return found
+
+    def put_many(self, mapping: dict[str, int]):
+        with self._lock:
+            for name, tag_id in mapping.items():
+                self._entries[name] = tag_id
+                self._entries.move_to_end(name)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, names: Iterable[str] = None):
+        """Drops the given names, or everything when names is None."""
+        with self._lock:
+            if names is None:
+                self._entries.clear()
+                return
+            for name in names:
+                self._entries.pop(name, None)
+
+
+tag_id_cache = TagIdCache()
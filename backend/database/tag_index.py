@@ -0,0 +1,137 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from contextlib import contextmanager
+from heapq import nsmallest
+from threading import Lock
+from typing import Iterable, Optional
+
+# prefixes matching more tags than this are answered by walking the usage
+# ranking instead of sorting the whole matching range
+_WIDE_RANGE = 256
+
+
+class TagIndex:
+    """
+    In-memory tag autocomplete: every tag's name and usage count, searched
+    by case-insensitive prefix and ranked by usage.
+
+    Built once from the database (crud.load_tag_index) and then kept
+    current by the crud write paths after they commit. Writes whose effect
+    on the counts is not known row by row call invalidate() and the next
+    search rebuilds.
+
+    A write's commit and its apply() run inside writing(). A load that
+    overlaps one is not installed: its rows may already include a commit
+    whose apply() is still to come, which would count the change twice.
+    """
+
+    def __init__(self):
+        self._tags: dict[int, list] = {}  # id -> [name, item count]
+        self._keys: list[tuple[str, int]] = []  # (casefolded name, id), sorted
+        self._ranked: Optional[list[int]] = None  # ids by usage, built lazily
+        self._loaded = False
+        # bumped by every change, so a load that raced with a write is discarded
+        self._generation = 0
+        self._writes = 0  # writes between commit and apply (see writing())
+        self._lock = Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def load(self, rows: Iterable[tuple[int, str, int]], generation: int) -> bool:
+        """
+        Installs (id, name, count) rows read when generation was current.
+        Returns False, leaving the index as it was, if a write overlapped.
+        """
+        tags = {tag_id: [name, count] for tag_id, name, count in rows}
+        with self._lock:
+            if generation != self._generation or self._writes:
+                return False
+            self._tags = tags
+            self._keys = sorted((name.casefold(), tag_id) for tag_id, (name, _) in tags.items())
+            self._ranked = None
+            self._loaded = True
+            return True
+
+    @contextmanager
+    def writing(self):
+        """Wraps a write from before its commit until its apply() has run."""
+        with self._lock:
+            self._writes += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._writes -= 1
+                self._generation += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._loaded = False
+
+    def apply(self, names: dict[str, int], deltas: Counter):
+        """
+        Adds committed changes: `names` maps tag names to ids (new tags are
+        added), `deltas` maps tag ids to the change in their item count.
+        """
+        with self._lock:
+            self._generation += 1
+            if not self._loaded:
+                return
+            for name, tag_id in names.items():
+                if tag_id not in self._tags:
+                    self._tags[tag_id] = [name, 0]
+                    insort(self._keys, (name.casefold(), tag_id))
+                    self._ranked = None
+            for tag_id, delta in deltas.items():
+                entry = self._tags.get(tag_id)
+                if entry is not None and delta:
+                    entry[1] += delta
+                    self._ranked = None
+
+    def rename(self, tag_id: int, name: str):
+        with self._lock:
+            self._generation += 1
+            entry = self._tags.get(tag_id) if self._loaded else None
+            if entry is None:
+                return
+            self._keys.remove((entry[0].casefold(), tag_id))
+            insort(self._keys, (name.casefold(), tag_id))
+            entry[0] = name
+            self._ranked = None
+
+    def search(self, prefix: str, limit: int) -> list[dict]:
+        """The `limit` most used tags starting with `prefix`."""
+        key = prefix.casefold()
+        with self._lock:
+            tags = self._tags
+            lo = bisect_left(self._keys, (key,))
+            hi = bisect_left(self._keys, (key + "\U0010ffff",), lo)
+
+            def rank(tag_id):
+                name, count = tags[tag_id]
+                return -count, name
+
+            if hi - lo <= _WIDE_RANGE:
+                ids = nsmallest(limit, (tag_id for _, tag_id in self._keys[lo:hi]), key=rank)
+            else:
+                if self._ranked is None:
+                    self._ranked = sorted(tags, key=rank)
+                # many tags match, so the walk reaches `limit` of them early
+                ids = []
+                for tag_id in self._ranked:
+                    if tags[tag_id][0].casefold().startswith(key):
+                        ids.append(tag_id)
+                        if len(ids) == limit:
+                            break
+
+            return [{"id": tag_id, "name": tags[tag_id][0], "item_count": tags[tag_id][1]} for tag_id in ids]
+
+
+tag_index = TagIndex()
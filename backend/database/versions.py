@@ -0,0 +1,34 @@
+import os
+from threading import Lock
+
+
+class DataVersions:
+    """
+    Monotonic per-table change counters, bumped by every crud write after
+    it commits. Counters live in memory; the boot token makes versions from
+    a previous process run distinguishable from the current ones.
+    """
+
+    def __init__(self):
+        self.boot = os.urandom(4).hex()
+        self._versions: dict[str, int] = {}
+        self._lock = Lock()
+
+    def get(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._versions)
+
+    def bump(self, *tables: str):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def etag(self, *tables: str) -> str:
+        parts = "-".join(f"{table}.{self.get(table)}" for table in tables)
+        return f'"{self.boot}-{parts}"'
+
+
+data_versions = DataVersions()
@@ -0,0 +1,164 @@
+"""
+Optional write pipeline (WARDROBE_WRITE_MODE=batched): crud writes from
+crud_async are queued to a single writer thread instead of each request
+taking SQLite's write lock and fsyncing on its own.
+
+The writer takes whatever is queued, waits up to WINDOW for more (at most
+MAX_BATCH operations) and runs the batch in one BEGIN IMMEDIATE
+transaction. Each operation runs in its own SAVEPOINT, so one that fails
+is rolled back alone and its caller gets the exception. The others commit
+together with a single fsync. Every caller's future resolves after the
+group commit, so a response is only sent once its write is durable.
+
+crud's post-commit work runs when the operation's commit() is reached,
+before the group commit. Events are therefore held back until the commit,
+data versions bumped during the batch are bumped again after it, so a
+list cached in between is never served, and the whole batch counts as
+one write in progress for tag_index. If the group commit itself fails,
+the in-memory tag caches are dropped.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextvars import copy_context
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from backend import events
+
+from .database import engine
+from .tag_cache import tag_id_cache
+from .tag_index import tag_index
+from .versions import data_versions
+
+logger = logging.getLogger(__name__)
+
+WRITE_MODE = os.getenv("WARDROBE_WRITE_MODE", "direct")
+if WRITE_MODE not in ("direct", "batched"):
+    raise ValueError(f"Unknown WARDROBE_WRITE_MODE {WRITE_MODE!r}, expected 'direct' or 'batched'")
+
+WINDOW = float(os.getenv("WARDROBE_WRITE_WINDOW_MS", "2")) / 1000
+MAX_BATCH = int(os.getenv("WARDROBE_WRITE_MAX_BATCH", "64"))
+
+
+class _BatchSession(Session):
+    # crud commits once per write; in a batch that only ends the
+    # operation, the writer commits the whole batch
+    def commit(self):
+        self.flush()
+
+
+class _Operation:
+    __slots__ = ("fn", "args", "kwargs", "context", "future")
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        # run under the caller's context: request metrics and the query
+        # guard count the statements against the request that sent them
+        self.context = copy_context()
+        self.future = Future()
+
+
+class Writer:
+    def __init__(self):
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Queues fn(session, *args, **kwargs); the future holds its result."""
+        operation = _Operation(fn, args, kwargs)
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="wardrobe-writer", daemon=True)
+                self._thread.start()
+        self._queue.put(operation)
+        return operation.future
+
+    def shutdown(self):
+        """Finishes the queued writes and stops the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _collect(self) -> Optional[list]:
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + WINDOW
+        while len(batch) < MAX_BATCH:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                operation = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if operation is None:
+                # stop after this batch
+                self._queue.put(None)
+                break
+            batch.append(operation)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            try:
+                self._commit(batch)
+            except Exception:
+                logger.exception("Write batch failed")
+
+    def _commit(self, batch: list):
+        results = {}
+        versions = data_versions.snapshot()
+        session = _BatchSession(bind=engine, expire_on_commit=False)
+        try:
+            # the operations apply() their tag counts before the group
+            # commit; keep tag_index loads out until it is done
+            with tag_index.writing(), events.held() as pending:
+                # take the write lock up front; the savepoints nest inside it
+                session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+                for operation in batch:
+                    held = len(pending)
+                    try:
+                        with session.begin_nested():
+                            results[operation] = operation.context.run(
+                                operation.fn, session, *operation.args, **operation.kwargs
+                            )
+                    except Exception as e:
+                        del pending[held:]
+                        operation.future.set_exception(e)
+                Session.commit(session)
+        except Exception as e:
+            session.rollback()
+            tag_id_cache.invalidate()
+            tag_index.invalidate()
+            for operation in batch:
+                if not operation.future.done():
+                    operation.future.set_exception(e)
+            raise
+        finally:
+            # results stay readable: expire_on_commit is off
+            session.close()
+
+        changed = [table for table, version in data_versions.snapshot().items() if versions.get(table) != version]
+        data_versions.bump(*changed)
+        for event in pending:
+            events.publish(*event)
+        for operation, result in results.items():
+            operation.future.set_result(result)
+
+
+writer = Writer()
@@ -0,0 +1,108 @@
+"""
+In-process change feed behind GET /api/events (server-sent events).
+
+crud publishes one small event per committed write:
+
+    {"entity": "item", "id": 12, "op": "update", "version": 345}
+
+`version` is the sync version the write stamped (see crud._next_sync_version),
+so a client can catch up with GET /api/sync?since=<version - 1>. Set-based
+writes (bulk create, batch update, tag merges) publish a single event with
+"id": null. Each subscriber has a bounded queue; when a slow client falls
+behind, the oldest events are dropped and the client gets a "reset" event
+telling it to resync instead.
+
+publish() is called from threadpool workers as well as the event loop, so
+delivery is handed to each subscriber's loop with call_soon_threadsafe.
+With no subscribers it returns immediately. Inside `held()` events are
+collected for the calling thread instead (the batched writer publishes
+them once its transaction commits).
+"""
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+import threading
+from threading import Lock
+from typing import Optional
+
+import orjson
+
+QUEUE_SIZE = 256
+
+_held = threading.local()
+
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        # deque(maxlen) drops the oldest entry when a new one arrives
+        self.events: deque[bytes] = deque(maxlen=maxsize)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def _put(self, event: bytes):
+        # runs on self.loop
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append(event)
+        self._ready.set()
+
+    async def next(self) -> Optional[bytes]:
+        """The next event, or None if events were dropped since the last call."""
+        while not self.events and not self.dropped:
+            self._ready.clear()
+            await self._ready.wait()
+        if self.dropped:
+            self.dropped = 0
+            return None
+        return self.events.popleft()
+
+
+class EventBus:
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: set[Subscription] = set()
+        self._lock = Lock()
+
+    @contextmanager
+    def subscribe(self):
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscription)
+
+    def publish(self, entity: str, entity_id: Optional[int], op: str, version: int):
+        pending = getattr(_held, "events", None)
+        if pending is not None:
+            pending.append((entity, entity_id, op, version))
+            return
+        if not self._subscribers:
+            return
+        event = orjson.dumps({"entity": entity, "id": entity_id, "op": op, "version": version})
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, event)
+            except RuntimeError:
+                # loop closed (shutdown); its stream is gone too
+                with self._lock:
+                    self._subscribers.discard(subscription)
+
+
+@contextmanager
+def held():
+    """Collects this thread's events in the yielded list instead of publishing them."""
+    _held.events = pending = []
+    try:
+        yield pending
+    finally:
+        _held.events = None
+
+
+bus = EventBus()
+publish = bus.publish
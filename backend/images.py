@@ -0,0 +1,165 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import AsyncIterator, Optional
+
+from backend.database.database import data_dir
+
+logger = logging.getLogger(__name__)
+
+# originals: images/<sha256>.<ext>, thumbnails: images/thumbs/<sha256>_<size>.<fmt>
+IMAGES_DIR = os.path.join(data_dir, "images")
+THUMBS_DIR = os.path.join(IMAGES_DIR, "thumbs")
+
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+THUMBNAIL_SIZES = (128, 256, 512)
+THUMBNAIL_FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+
+# magic-byte prefixes of the accepted upload formats
+_SIGNATURES = [
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+]
+
+ORIGINAL_NAME = re.compile(r"^(?P<digest>[0-9a-f]{64})\.(?P<ext>jpg|png|gif|webp)$")
+THUMBNAIL_NAME = re.compile(r"^(?P<digest>[0-9a-f]{64})_(?P<size>\d+)\.(?P<fmt>webp|jpg)$")
+IMAGE_URL = re.compile(r"^/api/images/(?P<digest>[0-9a-f]{64})\.\w+$")
+
+
+class ImageError(ValueError):
+    pass
+
+
+def _sniff_extension(head: bytes) -> Optional[str]:
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    for signature, ext in _SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    return None
+
+
+def original_url(digest: str, ext: str) -> str:
+    return f"/api/images/{digest}.{ext}"
+
+
+def thumbnail_urls(image_url: Optional[str]) -> Optional[dict[str, str]]:
+    """
+    WebP thumbnail URLs keyed by size for an uploaded image_url, None for
+    external or missing images. JPEG variants live at the same path with .jpg.
+    """
+    if not image_url:
+        return None
+    match = IMAGE_URL.match(image_url)
+    if not match:
+        return None
+    digest = match["digest"]
+    return {str(size): f"/api/images/thumbs/{digest}_{size}.webp" for size in THUMBNAIL_SIZES}
+
+
+async def store_upload(chunks: AsyncIterator[bytes]) -> tuple[str, str, bool]:
+    """
+    Streams an upload to disk while hashing it. Returns (digest, ext, created);
+    identical content maps to the same file, so re-uploads are free.
+    """
+    os.makedirs(IMAGES_DIR, exist_ok=True)
+    sha = hashlib.sha256()
+    size = 0
+    head = b""
+
+    fd, tmp_path = tempfile.mkstemp(dir=IMAGES_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise ImageError("Image is too large")
+                if len(head) < 16:
+                    head += chunk[:16]
+                sha.update(chunk)
+                tmp.write(chunk)
+
+        ext = _sniff_extension(head)
+        if ext is None:
+            raise ImageError("Unsupported image format (expected JPEG, PNG, GIF or WebP)")
+
+        digest = sha.hexdigest()
+        final_path = os.path.join(IMAGES_DIR, f"{digest}.{ext}")
+        if os.path.exists(final_path):
+            os.remove(tmp_path)
+            return digest, ext, False
+
+        os.replace(tmp_path, final_path)
+        return digest, ext, True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# ---------- THUMBNAILS ----------
+
+def make_thumbnails(source_path: str, digest: str):
+    """Runs in a worker process: writes every size/format of one image."""
+    from PIL import Image, ImageOps
+
+    os.makedirs(THUMBS_DIR, exist_ok=True)
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGB")
+        for size in THUMBNAIL_SIZES:
+            thumb = image.copy()
+            thumb.thumbnail((size, size), Image.LANCZOS)
+            for ext, pil_format in THUMBNAIL_FORMATS.items():
+                target = os.path.join(THUMBS_DIR, f"{digest}_{size}.{ext}")
+                # write then rename so readers never see a partial file
+                partial = target + ".part"
+                thumb.save(partial, pil_format, quality=82)
+                os.replace(partial, target)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=min(2, os.cpu_count() or 1))
+        return _pool
+
+
+def _log_failure(future):
+    error = future.exception()
+    if error is not None:
+        logger.warning("Thumbnail generation failed: %s", error)
+
+
+def has_thumbnails(digest: str) -> bool:
+    return all(
+        os.path.exists(os.path.join(THUMBS_DIR, f"{digest}_{size}.{ext}"))
+        for size in THUMBNAIL_SIZES
+        for ext in THUMBNAIL_FORMATS
+    )
+
+
+def schedule_thumbnails(digest: str, ext: str):
+    """Queues thumbnail generation off the request thread."""
+    source_path = os.path.join(IMAGES_DIR, f"{digest}.{ext}")
+    future = _get_pool().submit(make_thumbnails, source_path, digest)
+    future.add_done_callback(_log_failure)
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -1,40 +1,96 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.routers.items import router as items_router
 from backend.routers.locations import router as locations_router
 from backend.routers.categories import router as categories_router
-from backend.routers import categories
+from backend.routers.sync import router as sync_router
+from backend.routers.images import router as images_router
+from backend.routers.stats import router as stats_router
+from backend.routers.tags import router as tags_router
+from backend.routers.events import router as events_router
+from backend.routers.admin import router as admin_router
+from backend.routers.list_cache import list_cache
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 import os
 import sys
-from backend.database.database import engine , Base
+from backend import metrics, startup_profile
+from backend.images import shutdown_pool
+from backend.database.database import async_engine, engine
+from backend.database.query_guard import GUARD_MODE, QueryGuardMiddleware
+from backend.database.writer import writer
 from backend.database.seed import seed_database
+from backend.database.migrations import migrate
+
+
+def run_startup():
+    # each step is a single AppMeta lookup once the database is up to date
+    with startup_profile.phase("migrations"):
+        migrate()
+    with startup_profile.phase("seed"):
+        seed_database()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    run_startup()
+    if startup_profile.is_enabled():
+        print(startup_profile.report(), flush=True)
+
+    yield
 
-app = FastAPI()
-Base.metadata.create_all(bind=engine)
-seed_database()
+    writer.shutdown()
+    shutdown_pool()
+    engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+metrics.attach(engine)
+if async_engine is not None:
+    metrics.attach(async_engine.sync_engine)
 
 if not getattr(sys, "frozen", False):
     app.mount("/static", StaticFiles(directory="backend/static"), name="static")
-    
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Cache", "Server-Timing"],
 )
+if GUARD_MODE != "off":
+    app.add_middleware(QueryGuardMiddleware)
+# added last so it is outermost and times CORS and error handling too
+app.add_middleware(metrics.MetricsMiddleware)
 
 # Register routers here
 app.include_router(items_router, prefix="/api")
 app.include_router(locations_router, prefix="/api")
 app.include_router(categories_router, prefix="/api")
+app.include_router(sync_router, prefix="/api")
+app.include_router(images_router, prefix="/api")
+app.include_router(stats_router, prefix="/api")
+app.include_router(tags_router, prefix="/api")
+app.include_router(events_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
 
 @app.get("/")
 def root():
     return {"message": "My Wardrobe API is running","See more":"Visit http://localhost:5173/ !"}
 
+@app.get("/api/_cache", include_in_schema=False)
+def cache_stats():
+    return list_cache.stats()
+
+@app.get("/api/_metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Serve favicon.ico when the browser requests it
 @app.get("/favicon.ico", include_in_schema=False)
 async def favicon():
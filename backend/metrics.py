@@ -0,0 +1,222 @@
+"""
+Per-request timing and SQL counters, exported in Prometheus text format at
+/api/_metrics.
+
+MetricsMiddleware opens a RequestStats for every HTTP request; the cursor
+hooks attached to the engines add each statement's count and duration to it
+through a ContextVar (threadpool and run_sync calls inherit the context), and
+code that encodes response bodies wraps the encoding in `timed("serialize")`.
+With WARDROBE_SERVER_TIMING=1 the breakdown is also sent as a Server-Timing
+header, which browser / Tauri devtools show under Timing.
+"""
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Optional
+
+from sqlalchemy import event
+
+SERVER_TIMING = os.getenv("WARDROBE_SERVER_TIMING", "0") == "1"
+
+# seconds; requests are local SQLite round trips, so the low end is fine-grained
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+
+
+class RequestStats:
+    __slots__ = ("queries", "sql_seconds", "phases", "_query_started")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.phases: dict[str, float] = {}
+        self._query_started: list[float] = []
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current() -> Optional[RequestStats]:
+    return _current.get()
+
+
+@contextmanager
+def timed(phase: str):
+    """Adds the block's duration to `phase` of the current request, if any."""
+    stats = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.phases[phase] = stats.phases.get(phase, 0.0) + time.perf_counter() - start
+
+
+# ---------- SQL HOOKS ----------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats._query_started.append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None and stats._query_started:
+        stats.queries += 1
+        stats.sql_seconds += time.perf_counter() - stats._query_started.pop()
+
+
+def attach(engine):
+    """Counts and times the statements `engine` runs for a request."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ---------- HISTOGRAMS ----------
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, Prometheus style."""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: dict[tuple, list] = {}
+        self._lock = Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self, label_names: tuple) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in sorted(snapshot):
+            base = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(label_names, labels))
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+LABELS = ("method", "route")
+
+REQUEST_SECONDS = Histogram(
+    "wardrobe_request_duration_seconds", "Time from request to the last body byte.", TIME_BUCKETS
+)
+HANDLER_SECONDS = Histogram(
+    "wardrobe_request_handler_seconds",
+    "Request time not spent in SQL or explicit serialization.",
+    TIME_BUCKETS,
+)
+SQL_SECONDS = Histogram(
+    "wardrobe_request_sql_seconds", "Time spent executing SQL statements per request.", TIME_BUCKETS
+)
+SERIALIZE_SECONDS = Histogram(
+    "wardrobe_request_serialize_seconds", "Time spent encoding response bodies per request.", TIME_BUCKETS
+)
+QUERIES = Histogram(
+    "wardrobe_request_queries", "SQL statements executed per request.", QUERY_BUCKETS
+)
+
+HISTOGRAMS = (REQUEST_SECONDS, HANDLER_SECONDS, SQL_SECONDS, SERIALIZE_SECONDS, QUERIES)
+
+
+def record(method: str, route: str, total: float, stats: RequestStats):
+    labels = (method, route)
+    serialize = stats.phases.get("serialize", 0.0)
+    REQUEST_SECONDS.observe(labels, total)
+    HANDLER_SECONDS.observe(labels, max(0.0, total - stats.sql_seconds - serialize))
+    SQL_SECONDS.observe(labels, stats.sql_seconds)
+    SERIALIZE_SECONDS.observe(labels, serialize)
+    QUERIES.observe(labels, stats.queries)
+
+
+def render() -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render(LABELS))
+    return "\n".join(lines) + "\n"
+
+
+# ---------- MIDDLEWARE ----------
+
+def _server_timing(stats: RequestStats, elapsed: float) -> bytes:
+    serialize = stats.phases.get("serialize", 0.0)
+    entries = [
+        f'db;dur={stats.sql_seconds * 1000:.2f};desc="{stats.queries} queries"',
+        f"serialize;dur={serialize * 1000:.2f}",
+        f"app;dur={max(0.0, elapsed - stats.sql_seconds - serialize) * 1000:.2f}",
+    ]
+    return ", ".join(entries).encode("latin-1")
+
+
+def _route_label(scope) -> str:
+    """The matched path template, e.g. /api/items/{item_id}."""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        # unmatched paths are not labelled individually (unbounded cardinality)
+        return "unmatched"
+
+    # newer FastAPI versions keep included routers' prefixes out of route.path
+    path = scope["path"]
+    regex = getattr(route, "path_regex", None)
+    if regex is None or regex.match(path):
+        return template
+    for cut in range(1, len(path)):
+        if path[cut] == "/" and regex.match(path[cut:]):
+            return path[:cut] + template
+    return template
+
+
+class MetricsMiddleware:
+    """Pure ASGI so streamed bodies are timed to their last chunk."""
+
+    def __init__(self, app, server_timing: bool = SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and self.server_timing:
+                # streamed bodies keep running queries after this point;
+                # the histograms still see them
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(stats, time.perf_counter() - start)))
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            record(scope["method"], _route_label(scope), time.perf_counter() - start, stats)
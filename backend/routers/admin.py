@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, status
+
+from backend import backup
+from backend.database import schemas
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/backups", response_model=list[schemas.SnapshotOut])
+async def list_backups():
+    return [
+        {**manifest, "images": len(manifest["images"])} for manifest in backup.list_snapshots()
+    ]
+
+
+@router.post("/backup", response_model=schemas.BackupJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def start_backup():
+    # runs on a background thread; poll the job for progress
+    try:
+        return backup.start_backup()
+    except backup.BackupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        )
+
+
+@router.post("/restore", response_model=schemas.BackupJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def start_restore(payload: schemas.RestoreRequest = schemas.RestoreRequest()):
+    try:
+        return backup.start_restore(payload.snapshot)
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except backup.BackupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        )
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.BackupJobOut)
+async def get_job(job_id: str):
+    job = backup.get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    return job
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.exc import IntegrityError
 
-from backend.database.database import get_db
-from backend.database import schemas, crud
+from backend.database.database import get_session
+from backend.routers.list_cache import cached_list_response
+from backend.database import crud_async, schemas
 
 router = APIRouter(
     prefix="/categories",
@@ -11,23 +13,38 @@ router = APIRouter(
 )
 
 
-@router.get("/", response_model=list[schemas.CategoryOut])
-def list_categories(db: Session = Depends(get_db)):
-    return crud.get_categories(db)
+@router.get("/", response_model=Union[list[schemas.CategoryOut], list[schemas.CategoryCountOut]])
+async def list_categories(
+    request: Request,
+    with_counts: bool = Query(False, description="Add item_count to every category"),
+    db=Depends(get_session),
+):
+    # served pre-encoded; response_model still documents the shape
+    if with_counts:
+        return await cached_list_response(
+            request,
+            "categories_counts",
+            lambda: crud_async.get_categories(db, with_counts=True),
+            list[schemas.CategoryCountOut],
+            ("categories", "items"),
+        )
+    return await cached_list_response(
+        request, "categories", lambda: crud_async.get_categories(db), list[schemas.CategoryOut]
+    )
 
 
 @router.post("/", response_model=schemas.CategoryOut)
-def add_category(category: schemas.CategoryCreate, db: Session = Depends(get_db)):
+async def add_category(category: schemas.CategoryCreate, db=Depends(get_session)):
     try:
-        return crud.create_category(db, category)
+        return await crud_async.create_category(db=db, category=category)
     except IntegrityError:
-        db.rollback()
+        await crud_async.rollback(db)
         raise HTTPException(
             status_code=400,
             detail="Category with this name already exists",
         )
     except Exception:
-        db.rollback()
+        await crud_async.rollback(db)
         raise HTTPException(
             status_code=400,
             detail="Failed to create category",
@@ -35,17 +52,17 @@ def add_category(category: schemas.CategoryCreate, db: Session = Depends(get_db)
 
 
 @router.put("/{category_id}", response_model=schemas.CategoryOut)
-def update_category(category_id: int, payload: schemas.CategoryUpdate, db: Session = Depends(get_db)):
+async def update_category(category_id: int, payload: schemas.CategoryUpdate, db=Depends(get_session)):
     try:
-        updated = crud.update_category(db=db, category_id=category_id, payload=payload)
+        updated = await crud_async.update_category(db=db, category_id=category_id, payload=payload)
     except IntegrityError:
-        db.rollback()
+        await crud_async.rollback(db)
         raise HTTPException(
             status_code=400,
             detail="Invalid category data (constraint violation)",
         )
     except Exception:
-        db.rollback()
+        await crud_async.rollback(db)
         raise HTTPException(
             status_code=400,
             detail="Failed to update category",
@@ -60,9 +77,9 @@ def update_category(category_id: int, payload: schemas.CategoryUpdate, db: Sessi
 
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_category(category_id: int, db: Session = Depends(get_db)):
+async def delete_category(category_id: int, db=Depends(get_session)):
     try:
-        deleted = crud.delete_category(db=db, category_id=category_id)
+        deleted = await crud_async.delete_category(db=db, category_id=category_id)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
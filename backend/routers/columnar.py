@@ -0,0 +1,131 @@
+"""
+Compact columnar encoding of item lists, negotiated with the Accept header
+on GET /api/items/ (the default JSON stays the ItemOut array):
+
+    Accept: application/vnd.wardrobe.columnar+json
+    Accept: application/vnd.wardrobe.columnar+msgpack   (needs msgpack)
+
+    {
+      "version": 1,
+      "count": 2,
+      "columns": {
+        "id": [1, 2],
+        "name": ["Shirt", "Jeans"],
+        "brand": {"values": ["Levi's"], "codes": [null, 0]},
+        ...
+        "tags": [[3, 7], [7]]
+      },
+      "tags": {"id": [3, 7], "name": ["summer", "work"]}
+    }
+
+Every ItemOut field is an array with one entry per item. The
+low-cardinality string columns (DICT_COLUMNS) are dictionary-encoded:
+a value list plus, per item, an index into it or null. Item tags are tag
+ids, named once in the shared tag table. created_at is an ISO string.
+thumbnails is left out because it follows from image_url (see
+backend.images.thumbnail_urls).
+"""
+from typing import Optional
+
+import orjson
+
+from backend.database.crud import ITEM_OUT_COLUMNS
+
+COLUMNAR_JSON = "application/vnd.wardrobe.columnar+json"
+COLUMNAR_MSGPACK = "application/vnd.wardrobe.columnar+msgpack"
+MEDIA_TYPES = (COLUMNAR_JSON, COLUMNAR_MSGPACK)
+
+DICT_COLUMNS = ("brand", "color", "fit", "season")
+
+
+class NotAcceptable(Exception):
+    pass
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """The columnar media type the client asked for, None for plain JSON."""
+    if not accept:
+        return None
+    for part in accept.split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in MEDIA_TYPES:
+            return media_type
+    return None
+
+
+def _dictionary(values: list) -> dict:
+    index: dict = {}
+    codes = [None if value is None else index.setdefault(value, len(index)) for value in values]
+    return {"values": list(index), "codes": codes}
+
+
+def encode_columns(items: list[dict]) -> dict:
+    """Columnar form of get_item_rows() rows."""
+    columns = {}
+    for column in ITEM_OUT_COLUMNS:
+        values = [item[column] for item in items]
+        if column in DICT_COLUMNS:
+            columns[column] = _dictionary(values)
+        elif column == "created_at":
+            columns[column] = [value.isoformat() if value is not None else None for value in values]
+        else:
+            columns[column] = values
+
+    tag_names: dict[int, str] = {}
+    item_tags = []
+    for item in items:
+        ids = []
+        for tag in item["tags"]:
+            tag_names[tag["id"]] = tag["name"]
+            ids.append(tag["id"])
+        item_tags.append(ids)
+    columns["tags"] = item_tags
+
+    return {
+        "version": 1,
+        "count": len(items),
+        "columns": columns,
+        "tags": {"id": list(tag_names), "name": list(tag_names.values())},
+    }
+
+
+def dumps(media_type: str, document: dict) -> bytes:
+    if media_type == COLUMNAR_JSON:
+        return orjson.dumps(document)
+    try:
+        import msgpack
+    except ImportError:
+        raise NotAcceptable("MessagePack responses need the msgpack package")
+    return msgpack.packb(document, use_bin_type=True)
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def pick_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """br if accepted and available, else gzip if accepted, else None."""
+    accepted = {
+        part.split(";")[0].strip().lower()
+        for part in (accept_encoding or "").split(",")
+        if not part.strip().endswith(";q=0")
+    }
+    if "br" in accepted and _brotli() is not None:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "br":
+        return _brotli().compress(body, quality=5)
+    if encoding == "gzip":
+        import gzip
+
+        return gzip.compress(body, compresslevel=6)
+    return body
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from fastapi import Request, Response
+
+from backend.database.versions import data_versions
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    # If-None-Match uses weak comparison
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def etag_headers(*tables: str) -> dict:
+    """ETag (from the data versions of `tables`) plus revalidation headers."""
+    return {"ETag": data_versions.etag(*tables), "Cache-Control": "no-cache"}
+
+
+def not_modified(request: Request, headers: dict) -> Optional[Response]:
+    """Returns a 304 response if the client already has headers["ETag"]."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return None
+
@@ -0,0 +1,37 @@
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from backend.events import bus
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# a comment line this often lets dead connections fail their write and close
+KEEPALIVE_SECONDS = 30
+
+
+async def _stream():
+    with bus.subscribe() as subscription:
+        # reconnect delay for EventSource; also flushes the headers right away
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.next(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if event is None:
+                # the client fell behind and missed events: resync via /api/sync
+                yield b"event: reset\ndata: {}\n\n"
+            else:
+                yield b"event: change\ndata: " + event + b"\n\n"
+
+
+@router.get("")
+async def events():
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,62 @@
+import os
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import FileResponse
+
+from backend import images
+from backend.database import schemas
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+# content-addressed files never change, so caches may keep them forever
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@router.post("", response_model=schemas.ImageOut, status_code=status.HTTP_201_CREATED)
+async def upload_image(request: Request):
+    # the body is the raw image; store it under its sha256
+    try:
+        digest, ext, created = await images.store_upload(request.stream())
+    except images.ImageError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    url = images.original_url(digest, ext)
+    # re-uploads only regenerate thumbnails an earlier attempt failed to write
+    if created or not images.has_thumbnails(digest):
+        images.schedule_thumbnails(digest, ext)
+    return {"url": url, "thumbnails": images.thumbnail_urls(url)}
+
+
+@router.get("/thumbs/{filename}")
+async def get_thumbnail(filename: str):
+    match = images.THUMBNAIL_NAME.match(filename)
+    if not match or int(match["size"]) not in images.THUMBNAIL_SIZES:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    path = os.path.join(images.THUMBS_DIR, filename)
+    if os.path.exists(path):
+        return FileResponse(path, headers={"Cache-Control": IMMUTABLE})
+
+    # still being generated: fall back to the original, but don't let it be cached
+    for ext in ("jpg", "png", "gif", "webp"):
+        original = os.path.join(images.IMAGES_DIR, f"{match['digest']}.{ext}")
+        if os.path.exists(original):
+            return FileResponse(original, headers={"Cache-Control": "no-cache"})
+
+    raise HTTPException(status_code=404, detail="Image not found")
+
+
+@router.get("/{filename}")
+async def get_image(filename: str):
+    if not images.ORIGINAL_NAME.match(filename):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    path = os.path.join(images.IMAGES_DIR, filename)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    # FileResponse answers Range requests with 206 partial content
+    return FileResponse(path, headers={"Cache-Control": IMMUTABLE})
@@ -1,48 +1,304 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import csv
+import io
+import json
+from typing import Optional
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError
 
-from backend.database import crud, schemas
-from backend.database.database import get_db
+from backend import metrics
+from backend.database import crud, crud_async, schemas
+from backend.database.database import SessionLocal, get_session
+from backend.routers import columnar
+from backend.routers.etag import etag_headers, not_modified
+from backend.routers.list_cache import list_cache
 
 router = APIRouter(prefix="/items", tags=["items"])
 
 
 @router.get("/", response_model=list[schemas.ItemOut])
-def get_items(db: Session = Depends(get_db)):
-    return crud.get_items(db=db)
+async def get_items(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    category_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    season: Optional[str] = None,
+    brand: Optional[str] = None,
+    color: Optional[str] = None,
+    min_rating: Optional[int] = None,
+    max_rating: Optional[int] = None,
+    tag: Optional[str] = None,
+    db=Depends(get_session),
+):
+    filters = dict(
+        category_id=category_id,
+        location_id=location_id,
+        season=season,
+        brand=brand,
+        color=color,
+        min_rating=min_rating,
+        max_rating=max_rating,
+        tag=tag,
+    )
+    headers = etag_headers("items")
+    headers["Vary"] = "Accept, Accept-Encoding"
+
+    media_type = columnar.negotiate(request.headers.get("accept"))
+    if media_type is not None:
+        try:
+            return await _columnar_response(request, db, media_type, headers, cursor, limit, filters)
+        except columnar.NotAcceptable as e:
+            raise HTTPException(
+                status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                detail=str(e),
+            )
+
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
+    # without `limit` the full (filtered) list is returned, as before
+    try:
+        items, next_cursor = await crud_async.get_item_rows(db=db, cursor=cursor, limit=limit, **filters)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = next_cursor
+    # rows are already ItemOut-shaped; encode them directly instead of
+    # validating through response_model
+    with metrics.timed("serialize"):
+        content = orjson.dumps(items)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+async def _columnar_response(request, db, media_type, headers, cursor, limit, filters):
+    """GET /api/items/ in a columnar media type (see routers/columnar.py)."""
+    encoding = columnar.pick_encoding(request.headers.get("accept-encoding"))
+    raw_key = "items:columnar-" + media_type.rsplit("+", 1)[1]
+    key = raw_key if encoding is None else f"{raw_key}-{encoding}"
+    # one ETag per representation
+    headers["ETag"] = headers["ETag"][:-1] + f'-{key.split(":")[1]}"'
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
+    # the full list is cached per data version, both encoded and
+    # compressed; pages and filtered lists are encoded per request
+    cacheable = cursor is None and limit is None and all(value is None for value in filters.values())
+    body = raw = None
+    if cacheable:
+        version, body = list_cache.lookup(key, ("items",))
+        headers["X-Cache"] = "MISS" if body is None else "HIT"
+        if body is None and encoding is not None:
+            _, raw = list_cache.lookup(raw_key, ("items",))
+
+    if body is None:
+        if raw is None:
+            try:
+                items, next_cursor = await crud_async.get_item_rows(db=db, cursor=cursor, limit=limit, **filters)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e),
+                )
+            if next_cursor is not None:
+                headers["X-Next-Cursor"] = next_cursor
+            with metrics.timed("serialize"):
+                raw = columnar.dumps(media_type, columnar.encode_columns(items))
+            if cacheable:
+                list_cache.store(raw_key, version, raw)
+        if encoding is not None:
+            with metrics.timed("serialize"):
+                body = columnar.compress(raw, encoding)
+            if cacheable:
+                list_cache.store(key, version, body)
+        else:
+            body = raw
+
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+@router.get("/search", response_model=list[schemas.ItemOut])
+async def search_items(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=500),
+    db=Depends(get_session),
+):
+    return await crud_async.search_items(db=db, q=q, limit=limit)
 
 
 @router.post("/", response_model=schemas.ItemOut)
-def add_item(item: schemas.ItemCreate, db: Session = Depends(get_db)):
+async def add_item(item: schemas.ItemCreate, db=Depends(get_session)):
     try:
-        return crud.create_item(db=db, item=item)
+        return await crud_async.create_item(db=db, item=item)
     except IntegrityError:
-        db.rollback()
+        await crud_async.rollback(db)
         raise HTTPException(
             status_code=400,
             detail="Invalid item data (constraint violation)",
         )
     except Exception:
-        db.rollback()
+        await crud_async.rollback(db)
         raise HTTPException(
             status_code=400,
             detail="Failed to create item",
         )
 
 
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+
+
+async def _read_bulk_rows(request: Request):
+    """Reads raw rows from a JSON array body or an NDJSON stream."""
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith(NDJSON_MEDIA_TYPES):
+        rows = json.loads(await request.body())
+        if not isinstance(rows, list):
+            raise ValueError("Expected a JSON array of items")
+        return rows
+
+    rows = []
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        rows.extend(json.loads(line) for line in lines if line.strip())
+    if buffer.strip():
+        rows.append(json.loads(buffer))
+    return rows
+
+
+@router.post("/bulk", response_model=schemas.ItemBulkResult)
+async def bulk_import_items(request: Request, db=Depends(get_session)):
+    try:
+        rows = await _read_bulk_rows(request)
+    except ValueError as e:
+        # json.JSONDecodeError is a ValueError too
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Malformed import body: {e}",
+        )
+
+    items = []
+    for index, row in enumerate(rows):
+        try:
+            items.append(schemas.ItemCreate.model_validate(row))
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=422,
+                detail={"row": index, "errors": e.errors(include_url=False)},
+            )
+
+    try:
+        return await crud_async.bulk_create_items(db=db, items=items)
+    except IntegrityError:
+        await crud_async.rollback(db)
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid item data (constraint violation)",
+        )
+
+
+# StreamingResponse runs sync generators one next() per threadpool hop, so
+# the exports yield one chunk per database batch, not one per row
+
+def _export_ndjson():
+    db = SessionLocal()
+    try:
+        for rows in crud.iter_items_for_export(db):
+            yield b"".join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+    finally:
+        db.close()
+
+
+def _export_csv():
+    columns = ["id", *crud.ITEM_FIELDS, "created_at", "tags"]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    writer.writeheader()
+    yield flush()
+
+    db = SessionLocal()
+    try:
+        for rows in crud.iter_items_for_export(db):
+            for row in rows:
+                row["tags"] = ",".join(row["tags"])
+            writer.writerows(rows)
+            yield flush()
+    finally:
+        db.close()
+
+
+@router.get("/export")
+async def export_items(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    # the generators own their session: the response body is produced
+    # after this handler (and its dependencies) have returned
+    if format == "csv":
+        return StreamingResponse(
+            _export_csv(),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="items.csv"'},
+        )
+    return StreamingResponse(
+        _export_ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="items.ndjson"'},
+    )
+
+
+@router.patch("/batch", response_model=list[schemas.ItemOut])
+async def batch_update_items(payload: schemas.ItemBatchUpdate, db=Depends(get_session)):
+    try:
+        return await crud_async.batch_update_items(
+            db=db,
+            ids=payload.ids,
+            changes=payload.changes,
+            add_tags=payload.add_tags,
+            remove_tags=payload.remove_tags,
+        )
+    except LookupError as e:
+        await crud_async.rollback(db)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except IntegrityError:
+        await crud_async.rollback(db)
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid item data (constraint violation)",
+        )
+
+
 @router.put("/{item_id}", response_model=schemas.ItemOut)
-def update_item(item_id: int, payload: schemas.ItemUpdate, db: Session = Depends(get_db)):
+async def update_item(item_id: int, payload: schemas.ItemUpdate, db=Depends(get_session)):
     try:
-        updated = crud.update_item(db=db, item_id=item_id, payload=payload)
+        updated = await crud_async.update_item(db=db, item_id=item_id, payload=payload)
     except IntegrityError:
-        db.rollback()
+        await crud_async.rollback(db)
         raise HTTPException(
             status_code=400,
             detail="Invalid item data (constraint violation)",
         )
     except Exception:
-        db.rollback()
+        await crud_async.rollback(db)
         raise HTTPException(
             status_code=400,
             detail="Failed to update item",
@@ -57,8 +313,8 @@ def update_item(item_id: int, payload: schemas.ItemUpdate, db: Session = Depends
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_item(item_id: int, db: Session = Depends(get_db)):
-    deleted = crud.delete_item(db=db, item_id=item_id)
+async def delete_item(item_id: int, db=Depends(get_session)):
+    deleted = await crud_async.delete_item(db=db, item_id=item_id)
     if deleted is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
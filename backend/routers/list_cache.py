@@ -0,0 +1,90 @@
+from threading import Lock
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from backend import metrics
+from backend.database.versions import data_versions
+from backend.routers.etag import etag_headers, not_modified
+
+
+class SerializedListCache:
+    """
+    In-process cache of encoded JSON bodies for small, rarely written lists.
+
+    Entries are keyed on the table's data version, so the version bump done
+    by every crud write invalidates them. The version is read before the
+    rows, so a body built while a write commits is stored under the old
+    version and never served after the bump.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, tuple[tuple, bytes]] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: str, tables: Optional[tuple] = None) -> tuple[tuple, Optional[bytes]]:
+        """
+        Returns (version, body); body is None on a miss. The entry is valid
+        for the data versions of `tables` (default: the table named `key`).
+        Pass the version on to store(), it was read before any rows were.
+        """
+        version = tuple(data_versions.get(table) for table in tables or (key,))
+        entry = self._entries.get(key)
+        with self._lock:
+            if entry and entry[0] == version:
+                self.hits += 1
+                return version, entry[1]
+            self.misses += 1
+        return version, None
+
+    def store(self, key: str, version: tuple, body: bytes):
+        with self._lock:
+            self._entries[key] = (version, body)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": {key: list(version) for key, (version, _) in self._entries.items()},
+        }
+
+
+list_cache = SerializedListCache()
+
+_adapters: dict[Any, TypeAdapter] = {}
+
+
+async def cached_list_response(
+    request: Request,
+    table: str,
+    fetch: Callable[[], Awaitable[list]],
+    response_model: Any,
+    tables: Optional[tuple] = None,
+) -> Response:
+    """
+    Serves a read-only endpoint from `list_cache`: 304 on a matching ETag,
+    otherwise the cached (or freshly encoded) JSON body as-is. `table` is
+    the cache key; `tables` lists what the body is built from, if more.
+    """
+    tables = tables or (table,)
+    headers = etag_headers(*tables)
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
+    version, body = list_cache.lookup(table, tables)
+    headers["X-Cache"] = "MISS" if body is None else "HIT"
+    if body is None:
+        adapter = _adapters.get(response_model)
+        if adapter is None:
+            adapter = _adapters[response_model] = TypeAdapter(response_model)
+
+        rows = await fetch()
+        with metrics.timed("serialize"):
+            body = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+        list_cache.store(table, version, body)
+
+    return Response(content=body, media_type="application/json", headers=headers)
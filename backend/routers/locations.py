@@ -1,30 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.exc import IntegrityError
 
-from backend.database import crud, schemas
-from backend.database.database import get_db
+from backend.database import crud_async, schemas
+from backend.database.database import get_session
+from backend.routers.list_cache import cached_list_response
 
 router = APIRouter(prefix="/locations", tags=["locations"])
 
 
-@router.get("/", response_model=list[schemas.LocationOut])
-def get_locations(db: Session = Depends(get_db)):
-    return crud.get_locations(db)
+@router.get("/", response_model=Union[list[schemas.LocationOut], list[schemas.LocationCountOut]])
+async def get_locations(
+    request: Request,
+    with_counts: bool = Query(False, description="Add item_count to every location"),
+    db=Depends(get_session),
+):
+    # served pre-encoded; response_model still documents the shape
+    if with_counts:
+        return await cached_list_response(
+            request,
+            "locations_counts",
+            lambda: crud_async.get_locations(db, with_counts=True),
+            list[schemas.LocationCountOut],
+            ("locations", "items"),
+        )
+    return await cached_list_response(
+        request, "locations", lambda: crud_async.get_locations(db), list[schemas.LocationOut]
+    )
 
 
 @router.post("/", response_model=schemas.LocationOut)
-def create_location(location: schemas.LocationCreate, db: Session = Depends(get_db)):
+async def create_location(location: schemas.LocationCreate, db=Depends(get_session)):
     try:
-        return crud.create_location(db=db, location=location)
+        return await crud_async.create_location(db=db, location=location)
     except IntegrityError:
-        db.rollback()
+        await crud_async.rollback(db)
         raise HTTPException(
             status_code=400,
             detail="Location with this name already exists",
         )
     except Exception:
-        db.rollback()
+        await crud_async.rollback(db)
         raise HTTPException(
             status_code=400,
             detail="Failed to create location",
@@ -32,17 +49,17 @@ def create_location(location: schemas.LocationCreate, db: Session = Depends(get_
 
 
 @router.put("/{location_id}", response_model=schemas.LocationOut)
-def update_location(location_id: int, payload: schemas.LocationUpdate, db: Session = Depends(get_db)):
+async def update_location(location_id: int, payload: schemas.LocationUpdate, db=Depends(get_session)):
     try:
-        updated = crud.update_location(db=db, location_id=location_id, payload=payload)
+        updated = await crud_async.update_location(db=db, location_id=location_id, payload=payload)
     except IntegrityError:
-        db.rollback()
+        await crud_async.rollback(db)
         raise HTTPException(
             status_code=400,
             detail="Invalid location data (constraint violation)",
         )
     except Exception:
-        db.rollback()
+        await crud_async.rollback(db)
         raise HTTPException(
             status_code=400,
             detail="Failed to update location",
@@ -57,9 +74,9 @@ def update_location(location_id: int, payload: schemas.LocationUpdate, db: Sessi
 
 
 @router.delete("/{location_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_location(location_id: int, db: Session = Depends(get_db)):
+async def delete_location(location_id: int, db=Depends(get_session)):
     try:
-        deleted = crud.delete_location(db=db, location_id=location_id)
+        deleted = await crud_async.delete_location(db=db, location_id=location_id)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
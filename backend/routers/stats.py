@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, Request
+
+from backend.database import crud_async, schemas
+from backend.database.database import get_session
+from backend.routers.list_cache import cached_list_response
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+# item writes bump "items"; renames of categories / locations / tags change
+# the labels
+STATS_TABLES = ("items", "categories", "locations", "tags")
+
+
+@router.get("", response_model=schemas.StatsOut)
+async def get_stats(request: Request, db=Depends(get_session)):
+    return await cached_list_response(
+        request, "stats", lambda: crud_async.get_stats(db), schemas.StatsOut, STATS_TABLES
+    )
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends, Query
+
+from backend.database import crud_async, schemas
+from backend.database.database import get_session
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("", response_model=schemas.SyncOut)
+async def sync(since: int = Query(0, ge=0), db=Depends(get_session)):
+    # since=0 returns a full snapshot, afterwards pass the returned version
+    return await crud_async.get_changes(db=db, since=since)
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.exc import IntegrityError
+
+from backend.database import crud_async, schemas
+from backend.database.database import get_session
+from backend.database.tag_index import tag_index
+
+router = APIRouter(prefix="/tags", tags=["tags"])
+
+
+@router.get("/", response_model=list[schemas.TagCountOut])
+async def get_tags(
+    prefix: str = Query("", max_length=100, description="Case-insensitive name prefix"),
+    limit: int = Query(20, ge=1, le=200),
+    db=Depends(get_session),
+):
+    # answered from memory on the event loop; the database is only read to
+    # build the index on first use and after set-based tag writes
+    index = tag_index if tag_index.loaded else await crud_async.load_tag_index(db)
+    return index.search(prefix, limit)
+
+
+@router.put("/{tag_id}", response_model=schemas.TagOut)
+async def rename_tag(tag_id: int, payload: schemas.TagUpdate, db=Depends(get_session)):
+    try:
+        updated = await crud_async.rename_tag(db=db, tag_id=tag_id, payload=payload)
+    except IntegrityError:
+        await crud_async.rollback(db)
+        raise HTTPException(
+            status_code=400,
+            detail="Tag with this name already exists (merge the tags instead)",
+        )
+
+    if updated is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tag not found",
+        )
+    return updated
+
+
+@router.post("/merge", response_model=schemas.TagOut)
+async def merge_tags(payload: schemas.TagMerge, db=Depends(get_session)):
+    try:
+        return await crud_async.merge_tags(
+            db=db, source_ids=payload.source_ids, target_id=payload.target_id
+        )
+    except LookupError as e:
+        await crud_async.rollback(db)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
@@ -1,11 +1,26 @@
-import uvicorn
-from backend.main import app
+import multiprocessing
+import sys
 
-uvicorn.run(
-    app,
-    host="127.0.0.1",
-    port=8000,
-    reload=False,
-    log_config=None,
-)
 
+if __name__ == "__main__":
+    # thumbnail workers re-import this module in spawned/frozen processes;
+    # they must not start the server
+    multiprocessing.freeze_support()
+
+    # --profile-startup: time every import from here on plus the lifespan
+    # phases, and print the breakdown once the app is ready
+    if "--profile-startup" in sys.argv[1:]:
+        from backend import startup_profile
+
+        startup_profile.enable()
+
+    import uvicorn
+    from backend.main import app
+
+    uvicorn.run(
+        app,
+        host="127.0.0.1",
+        port=8000,
+        reload=False,
+        log_config=None,
+    )
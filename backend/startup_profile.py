@@ -0,0 +1,111 @@
+"""
+Cold-start profiler for `python -m backend.run_backend --profile-startup`.
+
+Stdlib only and imported before anything else, so it can time every import
+that follows. Startup phases in main.lifespan are always recorded (the cost
+is a perf_counter call); the report is only printed when profiling is on.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+from importlib.abc import MetaPathFinder
+
+_started = time.perf_counter()
+_enabled = False
+
+# module -> (cumulative seconds, self seconds)
+_imports: dict[str, tuple[float, float]] = {}
+_phases: list[tuple[str, float]] = []
+
+# default cold-start budget, override with WARDROBE_STARTUP_TARGET_MS
+DEFAULT_TARGET_MS = 1500
+
+
+class _TimingLoader:
+    def __init__(self, loader, stack):
+        self._loader = loader
+        self._stack = stack
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            _imports[module.__name__] = (elapsed, elapsed - children)
+
+
+class _ImportTimer(MetaPathFinder):
+    """Wraps the loader of every module found by the remaining finders."""
+
+    def __init__(self):
+        self._stack: list[float] = []
+        self._resolving: set[str] = set()
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname in self._resolving:
+            return None
+        self._resolving.add(fullname)
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimingLoader(spec.loader, self._stack)
+                    return spec
+            return None
+        finally:
+            self._resolving.discard(fullname)
+
+
+def enable():
+    global _enabled
+    if not _enabled:
+        _enabled = True
+        sys.meta_path.insert(0, _ImportTimer())
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+@contextmanager
+def phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases.append((name, time.perf_counter() - start))
+
+
+def report(top: int = 15) -> str:
+    total_ms = (time.perf_counter() - _started) * 1000
+    target_ms = float(os.getenv("WARDROBE_STARTUP_TARGET_MS", DEFAULT_TARGET_MS))
+
+    lines = ["", "=== startup profile ==="]
+    if _imports:
+        lines.append(f"slowest imports (top {top}, cumulative / self ms):")
+        slowest = sorted(_imports.items(), key=lambda entry: entry[1][0], reverse=True)
+        for name, (cumulative, own) in slowest[:top]:
+            lines.append(f"  {cumulative * 1000:8.1f} {own * 1000:8.1f}  {name}")
+
+    lines.append("phases (ms):")
+    for name, elapsed in _phases:
+        lines.append(f"  {elapsed * 1000:8.1f}  {name}")
+
+    verdict = "OK" if total_ms <= target_ms else "OVER TARGET"
+    lines.append(f"total to ready: {total_ms:.1f} ms (target {target_ms:.0f} ms) {verdict}")
+    return "\n".join(lines)
@@ -0,0 +1,18 @@
+import os
+import tempfile
+
+# backend.database reads its location at import time, so point it at a
+# throwaway directory before anything imports the app
+os.environ["WARDROBE_DATA_DIR"] = tempfile.mkdtemp(prefix="wardrobe-tests-")
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def client():
+    from backend.main import app
+
+    # entering the client runs the lifespan: migrations and seed data
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import text
+
+from backend.database import crud, models
+from backend.database.database import engine
+
+# (description, statement, index the plan must use)
+#
+# The statements come from crud's own query builders, so a change to the
+# code that stops a query from using its index fails here.
+HOT_QUERIES = [
+    (
+        "items by category (list filter)",
+        lambda: crud._item_rows_query(category_id=1),
+        "ix_items_category_season_brand",
+    ),
+    (
+        "items by category + season",
+        lambda: crud._item_rows_query(category_id=1, season="winter"),
+        "ix_items_category_season_brand",
+    ),
+    (
+        "category emptiness check (delete_category)",
+        lambda: crud._has_items_query(models.Item.category_id, 1),
+        "ix_items_category_season_brand",
+    ),
+    (
+        "item counts per category (?with_counts)",
+        lambda: crud._item_counts_query(models.Category, models.Item.category_id, models.Category.name),
+        "ix_items_category_season_brand",
+    ),
+    (
+        "item counts per location (?with_counts)",
+        lambda: crud._item_counts_query(models.Location, models.Item.location_id, models.Location.id),
+        "ix_items_location_id",
+    ),
+    (
+        "item counts per tag (tag autocomplete index)",
+        lambda: crud._item_counts_query(models.Tag, models.item_tags.c.tag_id, models.Tag.id),
+        "ix_item_tags_tag_id_item_id",
+    ),
+    (
+        "items by location (list filter)",
+        lambda: crud._item_rows_query(location_id=1),
+        "ix_items_location_id",
+    ),
+    (
+        "location detach (delete_location)",
+        lambda: crud._detach_location_query(1, 0),
+        "ix_items_location_id",
+    ),
+    (
+        "items by season",
+        lambda: crud._item_rows_query(season="winter"),
+        "ix_items_season",
+    ),
+    (
+        "items by brand",
+        lambda: crud._item_rows_query(brand="Acme"),
+        "ix_items_brand",
+    ),
+    (
+        "items by tag",
+        lambda: crud._item_rows_query(tag="summer"),
+        "ix_item_tags_tag_id_item_id",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "statement, index_name",
+    [(statement, index_name) for _, statement, index_name in HOT_QUERIES],
+    ids=[description for description, _, _ in HOT_QUERIES],
+)
+def test_hot_query_uses_index(client, statement, index_name):
+    with engine.connect() as conn:
+        sql = statement().compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        plan = " | ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    assert index_name in plan, plan
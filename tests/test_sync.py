@@ -0,0 +1,61 @@
+def _version(client):
+    return client.get("/api/sync", params={"since": 10**9}).json()["version"]
+
+
+def _create_item(client, name):
+    response = client.post("/api/items/", json={"name": name, "category_id": 1})
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def test_deleted_ids_are_not_reused(client):
+    _create_item(client, "kept")
+    doomed = _create_item(client, "doomed")
+    since = _version(client)
+
+    assert client.delete(f"/api/items/{doomed}").status_code == 204
+    recreated = _create_item(client, "recreated")
+    assert recreated != doomed
+
+    client.delete(f"/api/items/{recreated}")
+    bulk = client.post("/api/items/bulk", json=[{"name": "bulk", "category_id": 1}])
+    assert bulk.status_code == 200
+
+    changes = client.get("/api/sync", params={"since": since}).json()
+    live = {item["id"] for item in changes["items"]}
+    tombstones = {row["entity_id"] for row in changes["deleted"] if row["entity"] == "item"}
+    assert {doomed, recreated} <= tombstones
+    assert not live & tombstones
+
+
+def test_category_ids_are_not_reused(client):
+    category = client.post("/api/categories/", json={"name": "doomed category"}).json()["id"]
+    since = _version(client)
+    assert client.delete(f"/api/categories/{category}").status_code == 204
+
+    recreated = client.post("/api/categories/", json={"name": "new category"}).json()["id"]
+    assert recreated != category
+
+    changes = client.get("/api/sync", params={"since": since}).json()
+    assert {"entity": "category", "entity_id": category} in [
+        {"entity": row["entity"], "entity_id": row["entity_id"]} for row in changes["deleted"]
+    ]
+
+
+def test_superseded_tombstones_are_dropped(client):
+    from backend.database import models
+    from backend.database.database import SessionLocal
+
+    # a tombstone from before ids were AUTOINCREMENT, for an id now live again
+    item_id = _create_item(client, "reused")
+    since = _version(client) - 1
+    db = SessionLocal()
+    try:
+        db.add(models.Deletion(entity="item", entity_id=item_id, version=since))
+        db.commit()
+    finally:
+        db.close()
+
+    changes = client.get("/api/sync", params={"since": since - 1}).json()
+    assert item_id in {item["id"] for item in changes["items"]}
+    assert item_id not in {row["entity_id"] for row in changes["deleted"] if row["entity"] == "item"}